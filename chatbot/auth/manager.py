@@ -7,11 +7,14 @@ token storage, validation, refresh, and username detection.
 
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import aiohttp
+import random
+import time
+from typing import Optional, Dict, Any, Union
 from datetime import datetime
 
-from .oauth import TwitchOAuthClient
-from .tokens import TokenManager
+from .oauth import TwitchOAuthClient, REFRESH_NOT_RETRYABLE
+from .tokens import TokenManager, TokenState
 from ..database.operations import AuthTokenManager
 from ..database.models import AuthToken
 
@@ -24,8 +27,12 @@ class AuthenticationManager:
     token storage, and automatic refresh logic.
     """
     
+    # Seconds after a refresh during which the new token is trusted without
+    # asking Twitch to validate it
+    RECENT_REFRESH_SECONDS = 60
+    
     def __init__(self, client_id: str, client_secret: str, auth_token_manager: AuthTokenManager,
-                 encryption_key: Optional[str] = None):
+                 encryption_key: Optional[Union[str, bytes]] = None):
         """
         Initialize AuthenticationManager.
         
@@ -40,14 +47,112 @@ class AuthenticationManager:
         self.auth_token_manager = auth_token_manager
         
         self._current_token: Optional[AuthToken] = None
+        self._access_token_plain: Optional[str] = None
+        # time.monotonic() when Twitch issued the current token by refresh
+        self._refreshed_at_monotonic: Optional[float] = None
         self._bot_username: Optional[str] = None
+        
+        # Monotonic deadline until which the current token is known to be fresh
+        self._expires_at_monotonic = 0.0
+        
         self._retry_count = 0
         self._max_retries = 3
+        self._max_retry_delay = 30
+        
+        # Single-flight refresh: concurrent callers share one in-flight refresh
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_future: Optional[asyncio.Future] = None
+        
+        # Background task refreshing the token before it goes stale
+        self._refresher_task: Optional[asyncio.Task] = None
+        self._auto_refresh_lead = TokenManager.EXPIRY_BUFFER_SECONDS + 60
     
     async def close(self):
-        """Close HTTP sessions and cleanup resources."""
+        """
+        Release the HTTP session.
+        
+        The session is reopened on next use and proactive refresh keeps
+        running; use shutdown() to stop the manager for good.
+        """
         await self.oauth_client.close()
     
+    async def shutdown(self):
+        """Stop proactive token refresh and release the HTTP session."""
+        self._cancel_auto_refresh()
+        await self.close()
+    
+    def _schedule_auto_refresh(self):
+        """Start the background refresh task if it is not already running."""
+        if self._refresher_task is None or self._refresher_task.done():
+            self._refresher_task = asyncio.get_running_loop().create_task(self._auto_refresh_loop())
+    
+    def _cancel_auto_refresh(self):
+        """Stop the background refresh task."""
+        if self._refresher_task and not self._refresher_task.done():
+            self._refresher_task.cancel()
+        self._refresher_task = None
+    
+    async def _auto_refresh_loop(self):
+        """
+        Refresh the current token shortly before it would be considered expired,
+        so ensure_valid_token never has to refresh inline.
+        """
+        just_refreshed = False
+        
+        while self._current_token and self._current_token.refresh_token and self._current_token.expires_at:
+            remaining = self.token_manager.seconds_until_expiry(self._current_token.expires_at)
+            sleep_s = remaining - self._auto_refresh_lead
+            
+            if sleep_s > 0:
+                just_refreshed = False
+                await asyncio.sleep(sleep_s)
+                # Re-check, the token may have been replaced while sleeping
+                continue
+            
+            if just_refreshed:
+                # New token is already inside the refresh window, avoid looping
+                logger.warning("Refreshed token lifetime is too short for proactive refresh")
+                return
+            
+            logger.info("Proactively refreshing authentication token")
+            if not await self._refresh_stored_token(self._current_token):
+                logger.error("Proactive token refresh failed")
+                return
+            just_refreshed = True
+    
+    def _set_current_token(self, auth_token: Optional[AuthToken], access_token: Optional[str] = None,
+                           issued_by_refresh: bool = False):
+        """
+        Set the current token and precompute its freshness deadline.
+        
+        The decrypted access token is kept in memory so callers do not pay
+        a decrypt per request.
+        
+        Args:
+            auth_token: New current token, or None to clear it
+            access_token: Plain text access token, if already known
+            issued_by_refresh: Whether Twitch just issued this token to us
+        """
+        self._current_token = auth_token
+        self._refreshed_at_monotonic = time.monotonic() if issued_by_refresh else None
+        self._expires_at_monotonic = 0.0
+        
+        if auth_token and access_token is None:
+            access_token = self.token_manager.get_decrypted_access_token(auth_token)
+        self._access_token_plain = access_token if auth_token else None
+        
+        if auth_token and auth_token.expires_at:
+            remaining = self.token_manager.seconds_until_expiry(auth_token.expires_at)
+            # Same buffer as TokenManager.is_token_expired
+            remaining -= self.token_manager.EXPIRY_BUFFER_SECONDS
+            if remaining > 0:
+                self._expires_at_monotonic = time.monotonic() + remaining
+        
+        if auth_token:
+            self._schedule_auto_refresh()
+        else:
+            self._cancel_auto_refresh()
+    
     async def store_initial_tokens(self, access_token: str, refresh_token: Optional[str] = None,
                                  expires_in: Optional[int] = None) -> bool:
         """
@@ -92,7 +197,7 @@ class AuthenticationManager:
             
             # Store in database
             if await self.auth_token_manager.store_auth_tokens(auth_token):
-                self._current_token = auth_token
+                self._set_current_token(auth_token, access_token)
                 self._bot_username = bot_username
                 logger.info(f"Authentication tokens stored successfully for bot: {bot_username}")
                 return True
@@ -110,26 +215,27 @@ class AuthenticationManager:
         
         Returns:
             bool: True if valid tokens loaded, False otherwise
+            
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If Twitch could not be reached
         """
         try:
             # Load from database
-            stored_token = await self.auth_token_manager.get_auth_tokens()
+            stored_token = await self.auth_token_manager.get_auth_tokens_minimal()
             if not stored_token:
                 logger.info("No stored authentication tokens found")
                 return False
             
-            # Decrypt and validate
-            access_token = self.token_manager.get_decrypted_access_token(stored_token)
-            
-            # Check if token is expired
+            # Check expiry locally before spending a decrypt or a network call
             if self.token_manager.is_token_expired(stored_token.expires_at):
                 logger.info("Stored token is expired, attempting refresh")
                 return await self._refresh_stored_token(stored_token)
             
-            # Validate with Twitch
+            # Decrypt and validate with Twitch
+            access_token = self.token_manager.get_decrypted_access_token(stored_token)
             is_valid, token_info = await self.oauth_client.validate_token(access_token)
             if is_valid:
-                self._current_token = stored_token
+                self._set_current_token(stored_token, access_token)
                 self._bot_username = stored_token.bot_username
                 logger.info(f"Valid authentication tokens loaded for bot: {self._bot_username}")
                 return True
@@ -137,6 +243,9 @@ class AuthenticationManager:
                 logger.info("Stored token is invalid, attempting refresh")
                 return await self._refresh_stored_token(stored_token)
                 
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Twitch being unreachable says nothing about the stored token
+            raise
         except Exception as e:
             logger.error(f"Failed to load stored tokens: {e}")
             return False
@@ -145,6 +254,34 @@ class AuthenticationManager:
         """
         Refresh stored token using refresh token.
         
+        Concurrent callers wait on the refresh already in flight instead of
+        starting their own.
+        
+        Args:
+            stored_token: Current stored token
+            
+        Returns:
+            bool: True if refresh successful, False otherwise
+        """
+        if self._refresh_future and not self._refresh_future.done():
+            return await asyncio.shield(self._refresh_future)
+        
+        async with self._refresh_lock:
+            future = asyncio.get_running_loop().create_future()
+            self._refresh_future = future
+            try:
+                result = await self._perform_token_refresh(stored_token)
+                future.set_result(result)
+                return result
+            finally:
+                if not future.done():
+                    future.set_result(False)
+                self._refresh_future = None
+    
+    async def _perform_token_refresh(self, stored_token: AuthToken) -> bool:
+        """
+        Perform a single token refresh and persist the new tokens.
+        
         Args:
             stored_token: Current stored token
             
@@ -179,7 +316,8 @@ class AuthenticationManager:
             
             # Update in database
             if await self.auth_token_manager.update_auth_tokens(new_auth_token):
-                self._current_token = new_auth_token
+                self._set_current_token(new_auth_token, new_token_data['access_token'],
+                                        issued_by_refresh=True)
                 self._bot_username = stored_token.bot_username
                 logger.info("Authentication token refreshed successfully")
                 return True
@@ -191,6 +329,10 @@ class AuthenticationManager:
             logger.error(f"Failed to refresh stored token: {e}")
             return False
     
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, capped at the maximum retry delay."""
+        return min(self._max_retry_delay, (2 ** attempt) * (0.5 + random.random()))
+    
     async def _refresh_with_retry(self, refresh_token: str) -> Optional[Dict[str, Any]]:
         """
         Refresh token with exponential backoff retry logic.
@@ -203,22 +345,29 @@ class AuthenticationManager:
         """
         for attempt in range(self._max_retries):
             try:
-                new_token_data = await self.oauth_client.refresh_token(refresh_token)
+                new_token_data, retry_after = await self.oauth_client.refresh_token(refresh_token)
                 if new_token_data:
                     self._retry_count = 0  # Reset on success
                     return new_token_data
                 
-                # Wait before retry
+                if retry_after == REFRESH_NOT_RETRYABLE:
+                    logger.error("Refresh token was rejected, not retrying")
+                    return None
+                
+                # Wait before retry, honoring any server advertised delay up to
+                # the backoff cap since callers wait on the refresh lock
                 if attempt < self._max_retries - 1:
-                    delay = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    logger.warning(f"Token refresh attempt {attempt + 1} failed, retrying in {delay}s")
+                    if retry_after is not None:
+                        delay = min(retry_after, self._max_retry_delay)
+                    else:
+                        delay = self._retry_delay(attempt)
+                    logger.warning(f"Token refresh attempt {attempt + 1} failed, retrying in {delay:.1f}s")
                     await asyncio.sleep(delay)
                     
             except Exception as e:
                 logger.error(f"Token refresh attempt {attempt + 1} error: {e}")
                 if attempt < self._max_retries - 1:
-                    delay = 2 ** attempt
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(self._retry_delay(attempt))
         
         return None
     
@@ -230,21 +379,32 @@ class AuthenticationManager:
             Optional[str]: Valid access token or None if unavailable
         """
         try:
+            # Fast path: token known to be fresh, skip the expiry check
+            if self._current_token and time.monotonic() < self._expires_at_monotonic:
+                return self._access_token_plain
+            
             if not self._current_token:
                 # Try to load from database
                 if not await self.load_stored_tokens():
                     logger.error("No valid authentication tokens available")
                     return None
             
-            # Check if current token is expired
-            if self.token_manager.is_token_expired(self._current_token.expires_at):
+            # Only block on a refresh once the token has actually expired
+            state = self.token_manager.token_state(self._current_token.expires_at)
+            if state is TokenState.EXPIRED:
                 logger.info("Current token is expired, attempting refresh")
                 if not await self._refresh_stored_token(self._current_token):
                     logger.error("Failed to refresh expired token")
                     return None
+            elif state is TokenState.STALE:
+                logger.debug("Current token is stale, refreshing in background")
             
-            # Return decrypted access token
-            return self.token_manager.get_decrypted_access_token(self._current_token)
+            # Restart proactive refresh if it was stopped; a stale token is
+            # refreshed immediately by it while we return the current one
+            self._schedule_auto_refresh()
+            
+            # Return cached decrypted access token
+            return self._access_token_plain
             
         except Exception as e:
             logger.error(f"Failed to ensure valid token: {e}")
@@ -256,12 +416,21 @@ class AuthenticationManager:
         
         Returns:
             bool: True if authentication is valid, False otherwise
+            
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If Twitch could not be reached
         """
         try:
             access_token = await self.ensure_valid_token()
             if not access_token:
                 return False
             
+            # A token Twitch just issued from a refresh is known to be valid
+            if (self._refreshed_at_monotonic is not None and
+                    time.monotonic() - self._refreshed_at_monotonic < self.RECENT_REFRESH_SECONDS):
+                logger.info(f"Authentication validation successful for bot: {self._bot_username}")
+                return True
+            
             # Validate with Twitch
             is_valid, _ = await self.oauth_client.validate_token(access_token)
             if is_valid:
@@ -271,10 +440,24 @@ class AuthenticationManager:
                 logger.error("Authentication validation failed")
                 return False
                 
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Authentication validation error: {e}")
             return False
     
+    def get_token_seconds_remaining(self) -> Optional[float]:
+        """
+        Get the remaining lifetime of the current token.
+        
+        Returns:
+            Optional[float]: Seconds until expiry, or None if there is no
+            current token or its expiry is unknown
+        """
+        if not self._current_token or not self._current_token.expires_at:
+            return None
+        return self.token_manager.seconds_until_expiry(self._current_token.expires_at)
+    
     def get_bot_username(self) -> Optional[str]:
         """
         Get the authenticated bot's username.
@@ -296,8 +479,7 @@ class AuthenticationManager:
             
             # Revoke with Twitch if we have a current token
             if self._current_token:
-                access_token = self.token_manager.get_decrypted_access_token(self._current_token)
-                if not await self.oauth_client.revoke_token(access_token):
+                if not await self.oauth_client.revoke_token(self._access_token_plain):
                     logger.warning("Failed to revoke token with Twitch")
                     success = False
             
@@ -307,7 +489,7 @@ class AuthenticationManager:
                 success = False
             
             # Clear local state
-            self._current_token = None
+            self._set_current_token(None)
             self._bot_username = None
             
             if success:
@@ -319,7 +501,7 @@ class AuthenticationManager:
             logger.error(f"Failed to revoke tokens: {e}")
             return False
     
-    async def get_authorization_url(self, redirect_uri: str, state: Optional[str] = None) -> str:
+    def get_authorization_url(self, redirect_uri: str, state: Optional[str] = None) -> str:
         """
         Get authorization URL for OAuth flow.
         
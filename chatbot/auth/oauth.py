@@ -6,13 +6,68 @@ token refresh for Twitch API access.
 """
 
 import aiohttp
+import hashlib
 import logging
+import time
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
+from urllib.parse import quote, urlencode
 import asyncio
+import json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Retry delay returned by refresh_token when retrying cannot succeed
+REFRESH_NOT_RETRYABLE = float('inf')
+
+# Pooled HTTP session shared by all OAuth clients, reference counted by users
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_users = 0
+
+
+def _get_shared_session() -> aiohttp.ClientSession:
+    """Get or create the shared HTTP session for Twitch requests."""
+    global _shared_session
+    
+    # Creation does not await, so no lock is needed to avoid duplicate sessions
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            ),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+    return _shared_session
+
+
+async def _read_error_text(response: aiohttp.ClientResponse) -> str:
+    """Read an error response body and return the connection to the pool."""
+    try:
+        return await response.text()
+    finally:
+        await response.release()
+
+
+async def _release_shared_session():
+    """Release one reference to the shared session, closing it when unused."""
+    global _shared_session, _shared_session_users
+    
+    _shared_session_users = max(0, _shared_session_users - 1)
+    if _shared_session_users == 0 and _shared_session is not None:
+        if not _shared_session.closed:
+            await _shared_session.close()
+        _shared_session = None
+
 
 class TwitchOAuthClient:
     """Handles Twitch OAuth operations and token management."""
@@ -30,56 +85,143 @@ class TwitchOAuthClient:
         self.base_url = "https://id.twitch.tv/oauth2"
         self.api_base_url = "https://api.twitch.tv/helix"
         
-        # HTTP session for connection reuse
-        self._session: Optional[aiohttp.ClientSession] = None
+        # Endpoint URLs
+        self._validate_url = f"{self.base_url}/validate"
+        self._token_url = f"{self.base_url}/token"
+        self._revoke_url = f"{self.base_url}/revoke"
+        self._users_url = f"{self.api_base_url}/users"
+        
+        # Constant parts of request headers and bodies
+        self._helix_base_headers = {'Client-Id': client_id}
+        self._revoke_body_base = {'client_id': client_id}
+        
+        # Invariant part of the authorization URL
+        self._auth_url_prefix = f"{self.base_url}/authorize?" + urlencode(
+            {'client_id': client_id, 'response_type': 'code'}, quote_via=quote
+        )
+        
+        # Whether this client holds a reference to the shared HTTP session
+        self._holds_session = False
+        
+        # Validation results keyed by token hash: (expires_at, is_valid, token_info)
+        self._validate_ttl = 60.0
+        self._invalid_ttl = 5.0
+        self._validation_cache: Dict[str, Tuple[float, bool, Optional[Dict[str, Any]]]] = {}
+        # Serialises validation requests so concurrent callers share one result
+        self._validation_lock = asyncio.Lock()
     
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
-        if not self._session or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        return self._session
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, taking a reference on first use."""
+        global _shared_session_users
+        if not self._holds_session:
+            _shared_session_users += 1
+            self._holds_session = True
+        return _get_shared_session()
     
     async def close(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Release this client's reference to the shared HTTP session."""
+        if self._holds_session:
+            self._holds_session = False
+            await _release_shared_session()
+    
+    @staticmethod
+    def _validation_key(access_token: str) -> str:
+        """Get the validation cache key for an access token."""
+        return hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_validation(self, key: str) -> Optional[Tuple[bool, Optional[Dict[str, Any]]]]:
+        """Get a cached validation result if it has not expired."""
+        cached = self._validation_cache.get(key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1], cached[2]
+        return None
+    
+    def invalidate_validation(self, access_token: Optional[str] = None):
+        """
+        Drop cached validation results.
+        
+        Args:
+            access_token: Token to invalidate, or None to clear all cached results
+        """
+        if access_token is None:
+            self._validation_cache.clear()
+        else:
+            self._validation_cache.pop(self._validation_key(access_token), None)
     
     async def validate_token(self, access_token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
         Validate an access token with Twitch.
         
+        Results are cached briefly per token. Requests are made one at a
+        time, so concurrent callers for the same token share a single one.
+        
         Args:
             access_token: Access token to validate
             
         Returns:
             Tuple[bool, Optional[Dict]]: (is_valid, token_info)
+            
+        Raises:
+            aiohttp.ClientError: If Twitch could not be reached or had a server error
+            asyncio.TimeoutError: If the request timed out
         """
-        try:
-            session = await self._get_session()
+        key = self._validation_key(access_token)
+        cached = self._get_cached_validation(key)
+        if cached:
+            return cached
+        
+        async with self._validation_lock:
+            # Another caller may have validated while we waited
+            cached = self._get_cached_validation(key)
+            if cached:
+                return cached
             
-            headers = {
-                'Authorization': f'OAuth {access_token}'
-            }
+            session = self._get_session()
             
-            async with session.get(f"{self.base_url}/validate", headers=headers) as response:
-                if response.status == 200:
-                    token_info = await response.json()
-                    logger.info("Token validation successful")
-                    return True, token_info
-                elif response.status == 401:
-                    logger.warning("Token validation failed: token is invalid")
-                    return False, None
-                else:
-                    logger.error(f"Token validation failed with status {response.status}")
-                    return False, None
-                    
-        except Exception as e:
-            logger.error(f"Token validation error: {e}")
-            return False, None
+            try:
+                headers = {
+                    'Authorization': f'OAuth {access_token}'
+                }
+                
+                async with session.get(self._validate_url, headers=headers) as response:
+                    if response.status == 200:
+                        token_info = await response.json(loads=_json_loads)
+                        logger.info("Token validation successful")
+                        self._validation_cache[key] = (time.monotonic() + self._validate_ttl, True, token_info)
+                        return True, token_info
+                    elif response.status == 401:
+                        await response.release()
+                        logger.warning("Token validation failed: token is invalid")
+                        self._validation_cache[key] = (time.monotonic() + self._invalid_ttl, False, None)
+                        return False, None
+                    elif response.status >= 500:
+                        await response.release()
+                        # Twitch is having trouble, which says nothing about the token
+                        response.raise_for_status()
+                    else:
+                        await response.release()
+                        logger.error(f"Token validation failed with status {response.status}")
+                        return False, None
+                        
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Token validation could not reach Twitch: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Token validation error: {e}")
+                return False, None
     
-    async def refresh_token(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _parse_retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+        """Get the server advertised retry delay in seconds, if any."""
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+    
+    async def refresh_token(self, refresh_token: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
         """
         Refresh an access token using refresh token.
         
@@ -87,11 +229,14 @@ class TwitchOAuthClient:
             refresh_token: Refresh token
             
         Returns:
-            Optional[Dict]: New token data or None if failed
+            Tuple[Optional[Dict], Optional[float]]: (token_data, retry_after).
+            token_data is None if failed. retry_after is the server advertised
+            delay on 429/5xx, REFRESH_NOT_RETRYABLE if the refresh token was
+            rejected, or None otherwise.
         """
+        session = self._get_session()
+        
         try:
-            session = await self._get_session()
-            
             data = {
                 'grant_type': 'refresh_token',
                 'refresh_token': refresh_token,
@@ -99,19 +244,28 @@ class TwitchOAuthClient:
                 'client_secret': self.client_secret
             }
             
-            async with session.post(f"{self.base_url}/token", data=data) as response:
+            async with session.post(self._token_url, data=data) as response:
                 if response.status == 200:
-                    token_data = await response.json()
+                    token_data = await response.json(loads=_json_loads)
                     logger.info("Token refresh successful")
-                    return token_data
+                    # The previous access token is superseded
+                    self.invalidate_validation()
+                    return token_data, None
                 else:
-                    error_text = await response.text()
+                    if response.status == 400:
+                        # Invalid or revoked refresh token (invalid_grant)
+                        retry_after = REFRESH_NOT_RETRYABLE
+                    elif response.status == 429 or response.status >= 500:
+                        retry_after = self._parse_retry_after(response)
+                    else:
+                        retry_after = None
+                    error_text = await _read_error_text(response)
                     logger.error(f"Token refresh failed with status {response.status}: {error_text}")
-                    return None
+                    return None, retry_after
                     
         except Exception as e:
             logger.error(f"Token refresh error: {e}")
-            return None
+            return None, None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """
@@ -123,17 +277,14 @@ class TwitchOAuthClient:
         Returns:
             Optional[Dict]: User information or None if failed
         """
+        session = self._get_session()
+        
         try:
-            session = await self._get_session()
+            headers = {'Authorization': f'Bearer {access_token}', **self._helix_base_headers}
             
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Client-Id': self.client_id
-            }
-            
-            async with session.get(f"{self.api_base_url}/users", headers=headers) as response:
+            async with session.get(self._users_url, headers=headers) as response:
                 if response.status == 200:
-                    user_data = await response.json()
+                    user_data = await response.json(loads=_json_loads)
                     if user_data.get('data'):
                         logger.info("User info retrieved successfully")
                         return user_data['data'][0]  # Return first user (should be the authenticated user)
@@ -141,7 +292,7 @@ class TwitchOAuthClient:
                         logger.error("No user data in response")
                         return None
                 else:
-                    error_text = await response.text()
+                    error_text = await _read_error_text(response)
                     logger.error(f"Get user info failed with status {response.status}: {error_text}")
                     return None
                     
@@ -159,20 +310,19 @@ class TwitchOAuthClient:
         Returns:
             bool: True if successful, False otherwise
         """
+        self.invalidate_validation(access_token)
+        
+        session = self._get_session()
+        
         try:
-            session = await self._get_session()
+            data = {**self._revoke_body_base, 'token': access_token}
             
-            data = {
-                'client_id': self.client_id,
-                'token': access_token
-            }
-            
-            async with session.post(f"{self.base_url}/revoke", data=data) as response:
+            async with session.post(self._revoke_url, data=data) as response:
                 if response.status == 200:
                     logger.info("Token revoked successfully")
                     return True
                 else:
-                    error_text = await response.text()
+                    error_text = await _read_error_text(response)
                     logger.error(f"Token revocation failed with status {response.status}: {error_text}")
                     return False
                     
@@ -193,17 +343,15 @@ class TwitchOAuthClient:
             str: Authorization URL
         """
         params = {
-            'client_id': self.client_id,
             'redirect_uri': redirect_uri,
-            'response_type': 'code',
             'scope': ' '.join(scopes)
         }
         
         if state:
             params['state'] = state
         
-        query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-        return f"{self.base_url}/authorize?{query_string}"
+        query_string = urlencode(params, quote_via=quote)
+        return f"{self._auth_url_prefix}&{query_string}"
     
     async def exchange_code_for_token(self, code: str, redirect_uri: str) -> Optional[Dict[str, Any]]:
         """
@@ -216,9 +364,9 @@ class TwitchOAuthClient:
         Returns:
             Optional[Dict]: Token data or None if failed
         """
+        session = self._get_session()
+        
         try:
-            session = await self._get_session()
-            
             data = {
                 'client_id': self.client_id,
                 'client_secret': self.client_secret,
@@ -227,13 +375,13 @@ class TwitchOAuthClient:
                 'redirect_uri': redirect_uri
             }
             
-            async with session.post(f"{self.base_url}/token", data=data) as response:
+            async with session.post(self._token_url, data=data) as response:
                 if response.status == 200:
-                    token_data = await response.json()
+                    token_data = await response.json(loads=_json_loads)
                     logger.info("Authorization code exchange successful")
                     return token_data
                 else:
-                    error_text = await response.text()
+                    error_text = await _read_error_text(response)
                     logger.error(f"Code exchange failed with status {response.status}: {error_text}")
                     return None
                     
@@ -5,32 +5,95 @@ This module handles authentication validation during bot startup
 with clear error messaging and graceful failure handling.
 """
 
+import asyncio
 import logging
+import random
 import sys
+from datetime import datetime, timezone
+from enum import Enum
 from typing import Optional, Tuple
+
+import aiohttp
+
 from .manager import AuthenticationManager
 
 logger = logging.getLogger(__name__)
 
 
+class AuthErrorCategory(Enum):
+    """Reason a startup authentication attempt failed."""
+    NO_TOKEN = "no_token"  # No usable stored tokens
+    EXPIRED = "expired"    # Twitch rejected the token, a refresh may help
+    NETWORK = "network"    # Could not reach Twitch
+    UNKNOWN = "unknown"
+
+
 class StartupAuthValidator:
-    """Handles authentication validation during bot startup."""
+    """
+    Handles authentication validation during bot startup.
+    
+    The validator releases the auth manager's HTTP session once, either at
+    the end of perform_startup_validation or through aclose(). Validation
+    retries share the session until then; proactive token refresh keeps
+    running afterwards.
+    """
+    
+    __slots__ = ('auth_manager', 'trust_local_expiry', '_cached_bot_username', '_closed')
+    
+    # Tokens with at least this much lifetime left skip the Twitch validation step
+    TRUSTED_REMAINING_SECONDS = 600
     
-    def __init__(self, auth_manager: AuthenticationManager):
+    # Upper bound in seconds for the delay between validation attempts
+    MAX_RETRY_DELAY = 30
+    
+    def __init__(self, auth_manager: AuthenticationManager, trust_local_expiry: bool = True):
         """
         Initialize StartupAuthValidator.
         
         Args:
             auth_manager: AuthenticationManager instance
+            trust_local_expiry: Skip the Twitch validation step when the loaded
+                token is known to be valid for a while
         """
         self.auth_manager = auth_manager
+        self.trust_local_expiry = trust_local_expiry
+        self._cached_bot_username: Optional[str] = None
+        self._closed = False
+    
+    async def aclose(self) -> None:
+        """Close the auth manager's HTTP session if not already closed."""
+        if self._closed:
+            return
+        self._closed = True
+        await self.auth_manager.close()
     
-    async def validate_startup_authentication(self) -> Tuple[bool, Optional[str]]:
+    def _fail(self, error_msg: str) -> Tuple[bool, str]:
+        """
+        Log a validation failure.
+        
+        Args:
+            error_msg: Error message to log and return
+            
+        Returns:
+            Tuple[bool, str]: (False, error_msg)
+        """
+        logger.error(error_msg)
+        return False, error_msg
+    
+    def _get_bot_username(self) -> Optional[str]:
+        """Get the bot username, caching the first known value."""
+        if self._cached_bot_username is None:
+            self._cached_bot_username = self.auth_manager.get_bot_username()
+        return self._cached_bot_username
+    
+    async def validate_startup_authentication(
+            self) -> Tuple[bool, Optional[str], Optional[AuthErrorCategory]]:
         """
         Validate authentication during startup with comprehensive error handling.
         
         Returns:
-            Tuple[bool, Optional[str]]: (success, error_message)
+            Tuple[bool, Optional[str], Optional[AuthErrorCategory]]:
+            (success, error_message, error_category)
         """
         try:
             logger.info("Starting authentication validation...")
@@ -42,37 +105,42 @@ class StartupAuthValidator:
                     "No valid authentication tokens found. Please run the initial "
                     "OAuth setup to authenticate your bot account."
                 )
-                logger.error(error_msg)
-                return False, error_msg
+                return self._fail(error_msg) + (AuthErrorCategory.NO_TOKEN,)
             
-            # Step 2: Validate authentication with Twitch
-            logger.info("Validating authentication with Twitch...")
-            if not await self.auth_manager.validate_authentication():
-                error_msg = (
-                    "Authentication validation failed. Your tokens may be invalid "
-                    "or expired. Please re-authenticate your bot account."
-                )
-                logger.error(error_msg)
-                return False, error_msg
+            # Step 2: Validate authentication with Twitch, unless the token
+            # was just loaded and is known to be valid for a while
+            remaining = self.auth_manager.get_token_seconds_remaining()
+            if (self.trust_local_expiry and remaining is not None
+                    and remaining > self.TRUSTED_REMAINING_SECONDS):
+                logger.info("Stored token is fresh, skipping Twitch validation")
+            else:
+                logger.info("Validating authentication with Twitch...")
+                if not await self.auth_manager.validate_authentication():
+                    error_msg = (
+                        "Authentication validation failed. Your tokens may be invalid "
+                        "or expired. Please re-authenticate your bot account."
+                    )
+                    return self._fail(error_msg) + (AuthErrorCategory.EXPIRED,)
             
             # Step 3: Verify bot username is available
-            bot_username = self.auth_manager.get_bot_username()
+            bot_username = self._get_bot_username()
             if not bot_username:
                 error_msg = (
                     "Could not determine bot username from authentication tokens. "
                     "Please re-authenticate your bot account."
                 )
-                logger.error(error_msg)
-                return False, error_msg
+                return self._fail(error_msg) + (AuthErrorCategory.UNKNOWN,)
             
             # Success
             logger.info(f"Authentication validation successful for bot: {bot_username}")
-            return True, None
+            return True, None, None
             
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_msg = f"Network error during authentication validation: {e}"
+            return self._fail(error_msg) + (AuthErrorCategory.NETWORK,)
         except Exception as e:
             error_msg = f"Unexpected error during authentication validation: {e}"
-            logger.error(error_msg)
-            return False, error_msg
+            return self._fail(error_msg) + (AuthErrorCategory.UNKNOWN,)
     
     async def attempt_token_refresh(self) -> Tuple[bool, Optional[str]]:
         """
@@ -87,6 +155,7 @@ class StartupAuthValidator:
             # Try to ensure we have a valid token (this will attempt refresh)
             access_token = await self.auth_manager.ensure_valid_token()
             if access_token:
+                self._cached_bot_username = None
                 logger.info("Token refresh successful")
                 return True, None
             else:
@@ -94,13 +163,11 @@ class StartupAuthValidator:
                     "Token refresh failed. Your refresh token may be invalid "
                     "or expired. Please re-authenticate your bot account."
                 )
-                logger.error(error_msg)
-                return False, error_msg
+                return self._fail(error_msg)
                 
         except Exception as e:
             error_msg = f"Token refresh error: {e}"
-            logger.error(error_msg)
-            return False, error_msg
+            return self._fail(error_msg)
     
     async def handle_authentication_failure(self, error_message: str) -> None:
         """
@@ -109,47 +176,64 @@ class StartupAuthValidator:
         Args:
             error_message: Error message to display
         """
-        logger.error("=" * 60)
-        logger.error("AUTHENTICATION FAILURE")
-        logger.error("=" * 60)
-        logger.error(error_message)
-        logger.error("")
-        logger.error("To resolve this issue:")
-        logger.error("1. Ensure your Twitch application credentials are correct")
-        logger.error("2. Run the OAuth setup process to authenticate your bot")
-        logger.error("3. Verify your bot account has the required permissions")
-        logger.error("4. Check that your tokens haven't been revoked")
-        logger.error("=" * 60)
+        banner = "=" * 60
+        logger.error("\n".join([
+            banner,
+            "AUTHENTICATION FAILURE",
+            banner,
+            error_message,
+            "",
+            "To resolve this issue:",
+            "1. Ensure your Twitch application credentials are correct",
+            "2. Run the OAuth setup process to authenticate your bot",
+            "3. Verify your bot account has the required permissions",
+            "4. Check that your tokens haven't been revoked",
+            banner,
+        ]))
         
         # Log authentication event for monitoring
         logger.error("Bot startup failed due to authentication failure", extra={
             'event_type': 'startup_auth_failure',
             'error_message': error_message,
-            'timestamp': logger.handlers[0].formatter.formatTime(logger.makeRecord(
-                'startup', logging.ERROR, __file__, 0, '', (), None
-            )) if logger.handlers else None
+            'timestamp': datetime.now(timezone.utc).isoformat()
         })
     
     async def log_authentication_success(self) -> None:
         """Log successful authentication for monitoring."""
-        bot_username = self.auth_manager.get_bot_username()
+        bot_username = self._get_bot_username()
         
-        logger.info("Authentication validation completed successfully")
-        logger.info(f"Bot authenticated as: {bot_username}")
+        logger.info(
+            "Authentication validation completed successfully\n"
+            f"Bot authenticated as: {bot_username}"
+        )
         
         # Log authentication event for monitoring
         logger.info("Bot startup authentication successful", extra={
             'event_type': 'startup_auth_success',
             'bot_username': bot_username,
-            'timestamp': logger.handlers[0].formatter.formatTime(logger.makeRecord(
-                'startup', logging.INFO, __file__, 0, '', (), None
-            )) if logger.handlers else None
+            'timestamp': datetime.now(timezone.utc).isoformat()
         })
     
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Get the backoff delay before the next validation attempt.
+        
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            
+        Returns:
+            float: Delay in seconds
+        """
+        return min(self.MAX_RETRY_DELAY, 2 ** attempt) + random.uniform(0, 0.5)
+    
     async def validate_with_retry(self, max_retries: int = 2) -> bool:
         """
         Validate authentication with retry logic.
         
+        Failed attempts are retried with exponential backoff. Tokens are only
+        refreshed when Twitch rejected them, so network failures do not use
+        up refresh tokens.
+        
         Args:
             max_retries: Maximum number of retry attempts
             
@@ -162,18 +246,18 @@ class StartupAuthValidator:
                     logger.info(f"Authentication validation attempt {attempt + 1}/{max_retries + 1}")
                 
                 # First attempt: normal validation
-                success, error_msg = await self.validate_startup_authentication()
+                success, error_msg, category = await self.validate_startup_authentication()
                 if success:
                     await self.log_authentication_success()
                     return True
                 
-                # If first attempt fails, try token refresh
-                if attempt < max_retries:
+                # Only a rejected token can be fixed by refreshing it
+                if category is AuthErrorCategory.EXPIRED and attempt < max_retries:
                     logger.info("Initial validation failed, attempting token refresh...")
                     refresh_success, refresh_error = await self.attempt_token_refresh()
                     if refresh_success:
                         # Retry validation after refresh
-                        success, error_msg = await self.validate_startup_authentication()
+                        success, error_msg, category = await self.validate_startup_authentication()
                         if success:
                             await self.log_authentication_success()
                             return True
@@ -186,6 +270,9 @@ class StartupAuthValidator:
                 
             except Exception as e:
                 logger.error(f"Authentication attempt {attempt + 1} error: {e}")
+            
+            if attempt < max_retries:
+                await asyncio.sleep(self._retry_delay(attempt))
         
         # All attempts failed
         final_error = "Authentication validation failed after all retry attempts"
@@ -219,7 +306,7 @@ class StartupAuthValidator:
             return False
         finally:
             # Always close the auth manager's HTTP session
-            await self.auth_manager.close()
+            await self.aclose()
 
 
 async def validate_startup_authentication(auth_manager: AuthenticationManager) -> bool:
@@ -7,9 +7,15 @@ with encryption for sensitive data and automatic refresh logic.
 
 import base64
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from enum import Enum
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple, Union
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import os
 
 from ..database.models import AuthToken
@@ -17,25 +23,111 @@ from ..database.models import AuthToken
 logger = logging.getLogger(__name__)
 
 
+class TokenState(Enum):
+    """Freshness of an access token."""
+    FRESH = "fresh"      # Usable, no refresh needed
+    STALE = "stale"      # Usable, but inside the expiry buffer and due for refresh
+    EXPIRED = "expired"  # Expired or without known expiry, must refresh before use
+
+
+# Prefix marking tokens encrypted with ChaCha20-Poly1305
+_AEAD_PREFIX = "v2:"
+_AEAD_ASSOCIATED_DATA = b'twitch-oauth'
+_AEAD_NONCE_SIZE = 12
+
+# Fernet tokens start with the base64 encoded version byte 0x80
+_FERNET_PREFIX = "gAAAAA"
+
+# Process-wide fallback key used when no encryption key is passed in
+_DEFAULT_KEY: Optional[bytes] = None
+
+
+def _get_default_key() -> bytes:
+    """
+    Get the process-wide fallback encryption key.
+    
+    The key is read from TOKEN_ENCRYPTION_KEY on first use. If that is not
+    set, a key is generated once and reused by every TokenManager in this
+    process, so tokens written by one instance stay readable by the others.
+    
+    Returns:
+        bytes: URL-safe base64-encoded 32-byte key
+    """
+    global _DEFAULT_KEY
+    if _DEFAULT_KEY is None:
+        env_key = os.environ.get('TOKEN_ENCRYPTION_KEY')
+        if env_key:
+            _DEFAULT_KEY = env_key.encode('ascii')
+        else:
+            _DEFAULT_KEY = Fernet.generate_key()
+            logger.warning("Generated new encryption key. Store this securely: %s", 
+                         _DEFAULT_KEY.decode('ascii'))
+    return _DEFAULT_KEY
+
+
 class TokenManager:
-    """Manages secure storage and encryption of authentication tokens."""
+    """
+    Manages secure storage and encryption of authentication tokens.
+    
+    Tokens are encrypted with ChaCha20-Poly1305 using a key derived from the
+    configured Fernet key, and stored as "v2:" + base64(nonce || ciphertext),
+    a single base64 layer. Legacy Fernet tokens can still be decrypted, both
+    as plain Fernet tokens and in the older base64-wrapped Fernet form.
+    """
+    
+    __slots__ = ('encryption_key', 'cipher', 'aead', '_decrypt_cache', '_monotonic_expiry')
+    
+    # Tokens are treated as expired this long before their actual expiry
+    EXPIRY_BUFFER_SECONDS = 300
+    
+    # Decrypted token cache bounds
+    DECRYPT_CACHE_TTL = 300.0
+    DECRYPT_CACHE_SIZE = 64
+    
+    # Number of created tokens whose monotonic deadlines are remembered
+    MONOTONIC_EXPIRY_SIZE = 8
     
-    def __init__(self, encryption_key: Optional[str] = None):
+    def __init__(self, encryption_key: Optional[Union[str, bytes]] = None):
         """
         Initialize TokenManager with encryption.
         
         Args:
-            encryption_key: Base64-encoded encryption key. If None, generates new key.
+            encryption_key: URL-safe base64-encoded 32-byte key, as str or bytes.
+                If None, uses the TOKEN_ENCRYPTION_KEY environment variable,
+                or a key generated once per process.
+                
+        Raises:
+            ValueError: If the encryption key is not a valid key
         """
-        if encryption_key:
-            self.encryption_key = encryption_key.encode()
+        if isinstance(encryption_key, bytes):
+            self.encryption_key = encryption_key
+        elif encryption_key:
+            self.encryption_key = encryption_key.encode('ascii')
         else:
-            # Generate a new key if none provided
-            self.encryption_key = Fernet.generate_key()
-            logger.warning("Generated new encryption key. Store this securely: %s", 
-                         base64.b64encode(self.encryption_key).decode())
+            self.encryption_key = _get_default_key()
+        
+        try:
+            raw_key = base64.urlsafe_b64decode(self.encryption_key)
+        except (ValueError, TypeError):
+            raw_key = b''
+        if len(raw_key) != 32:
+            logger.error("Invalid token encryption key")
+            raise ValueError("Token encryption key must be 32 url-safe base64-encoded bytes")
         
         self.cipher = Fernet(self.encryption_key)
+        self.aead = ChaCha20Poly1305(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'token-encryption'
+        ).derive(raw_key))
+        
+        # Decrypted plaintext keyed by ciphertext: (cached_at, plaintext)
+        self._decrypt_cache: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        
+        # Monotonic expiry deadlines of tokens created in this process, keyed
+        # by expires_at, so wall clock jumps do not affect their expiry checks
+        self._monotonic_expiry: Dict[Union[datetime, int], float] = {}
     
     def encrypt_token(self, token: str) -> str:
         """
@@ -48,8 +140,9 @@ class TokenManager:
             str: Encrypted token as base64 string
         """
         try:
-            encrypted_bytes = self.cipher.encrypt(token.encode())
-            return base64.b64encode(encrypted_bytes).decode()
+            nonce = os.urandom(_AEAD_NONCE_SIZE)
+            encrypted_bytes = self.aead.encrypt(nonce, token.encode(), _AEAD_ASSOCIATED_DATA)
+            return _AEAD_PREFIX + base64.b64encode(nonce + encrypted_bytes).decode()
         except Exception as e:
             logger.error(f"Failed to encrypt token: {e}")
             raise
@@ -64,20 +157,65 @@ class TokenManager:
         Returns:
             str: Decrypted plain text token
         """
+        cached = self._decrypt_cache.get(encrypted_token)
+        if cached and time.monotonic() - cached[0] < self.DECRYPT_CACHE_TTL:
+            self._decrypt_cache.move_to_end(encrypted_token)
+            return cached[1]
+        
         try:
-            encrypted_bytes = base64.b64decode(encrypted_token.encode())
-            decrypted_bytes = self.cipher.decrypt(encrypted_bytes)
-            return decrypted_bytes.decode()
+            if encrypted_token.startswith(_AEAD_PREFIX):
+                data = base64.b64decode(encrypted_token[len(_AEAD_PREFIX):])
+                decrypted_bytes = self.aead.decrypt(
+                    data[:_AEAD_NONCE_SIZE], data[_AEAD_NONCE_SIZE:], _AEAD_ASSOCIATED_DATA
+                )
+            elif encrypted_token.startswith(_FERNET_PREFIX):
+                # Legacy plain Fernet token
+                decrypted_bytes = self.cipher.decrypt(encrypted_token.encode('ascii'))
+            else:
+                # Legacy base64-wrapped Fernet token
+                encrypted_bytes = base64.b64decode(encrypted_token.encode())
+                decrypted_bytes = self.cipher.decrypt(encrypted_bytes)
+            token = decrypted_bytes.decode()
         except Exception as e:
             logger.error(f"Failed to decrypt token: {e}")
             raise
+        
+        self._cache_plaintext(encrypted_token, token)
+        return token
+    
+    def _cache_plaintext(self, encrypted_token: str, token: str):
+        """Remember the plaintext for a ciphertext, evicting the oldest entries."""
+        self._decrypt_cache[encrypted_token] = (time.monotonic(), token)
+        self._decrypt_cache.move_to_end(encrypted_token)
+        if len(self._decrypt_cache) > self.DECRYPT_CACHE_SIZE:
+            self._decrypt_cache.popitem(last=False)
+    
+    def seconds_until_expiry(self, expires_at: Union[datetime, int]) -> float:
+        """
+        Get the seconds remaining until a token expires.
+        
+        Uses the monotonic clock for tokens created in this process and the
+        wall clock for tokens loaded from the database.
+        
+        Args:
+            expires_at: Token expiration datetime or Unix timestamp
+            
+        Returns:
+            float: Seconds until expiry, negative once expired
+        """
+        deadline = self._monotonic_expiry.get(expires_at)
+        if deadline is not None:
+            return deadline - time.monotonic()
+        if isinstance(expires_at, datetime):
+            return expires_at.timestamp() - time.time()
+        return expires_at - time.time()
     
-    def is_token_expired(self, expires_at: Optional[datetime]) -> bool:
+    def is_token_expired(self, expires_at: Optional[Union[datetime, int]]) -> bool:
         """
         Check if a token is expired.
         
         Args:
-            expires_at: Token expiration datetime
+            expires_at: Token expiration datetime or Unix timestamp
             
         Returns:
             bool: True if expired or no expiration date, False otherwise
@@ -86,8 +224,28 @@ class TokenManager:
             return True
         
         # Add 5 minute buffer to avoid edge cases
-        buffer_time = timedelta(minutes=5)
-        return datetime.now() >= (expires_at - buffer_time)
+        return self.seconds_until_expiry(expires_at) <= self.EXPIRY_BUFFER_SECONDS
+    
+    def token_state(self, expires_at: Optional[Union[datetime, int]]) -> TokenState:
+        """
+        Classify a token by how close it is to expiring.
+        
+        Args:
+            expires_at: Token expiration datetime or Unix timestamp
+            
+        Returns:
+            TokenState: STALE within the expiry buffer, EXPIRED once past
+            expiry or without an expiration date, FRESH otherwise
+        """
+        if not expires_at:
+            return TokenState.EXPIRED
+        
+        remaining = self.seconds_until_expiry(expires_at)
+        if remaining <= 0:
+            return TokenState.EXPIRED
+        if remaining <= self.EXPIRY_BUFFER_SECONDS:
+            return TokenState.STALE
+        return TokenState.FRESH
     
     def create_auth_token(self, access_token: str, refresh_token: Optional[str] = None,
                          expires_in: Optional[int] = None, bot_username: Optional[str] = None) -> AuthToken:
@@ -108,10 +266,19 @@ class TokenManager:
             encrypted_access = self.encrypt_token(access_token)
             encrypted_refresh = self.encrypt_token(refresh_token) if refresh_token else None
             
-            # Calculate expiration time
+            # We already know the plaintext, no need to decrypt it later
+            self._cache_plaintext(encrypted_access, access_token)
+            if encrypted_refresh:
+                self._cache_plaintext(encrypted_refresh, refresh_token)
+            
+            # Calculate expiration time from the same clock reading as created_at
+            now = time.time()
             expires_at = None
             if expires_in:
-                expires_at = datetime.now() + timedelta(seconds=expires_in)
+                expires_at = datetime.fromtimestamp(now + expires_in)
+                self._monotonic_expiry[expires_at] = time.monotonic() + expires_in
+                if len(self._monotonic_expiry) > self.MONOTONIC_EXPIRY_SIZE:
+                    del self._monotonic_expiry[next(iter(self._monotonic_expiry))]
             
             return AuthToken(
                 id=None,
@@ -119,7 +286,7 @@ class TokenManager:
                 refresh_token=encrypted_refresh,
                 expires_at=expires_at,
                 bot_username=bot_username,
-                created_at=datetime.now()
+                created_at=datetime.fromtimestamp(now)
             )
             
         except Exception as e:
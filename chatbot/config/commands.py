@@ -5,66 +5,166 @@ This module handles parsing and processing of !clank commands
 for configuration management.
 """
 
+import asyncio
 import logging
 import re
-from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+import time
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple, Any
 
-from ..database.operations import ChannelConfigManager
+from ..database.operations import ChannelConfigManager, MetricsManager
 from ..ollama.client import OllamaClient
 
 logger = logging.getLogger(__name__)
 
+# Allowed characters in Ollama model names
+_MODEL_NAME_RE = re.compile(r'\A[A-Za-z0-9._-]+\Z', re.ASCII)
+
+# Valid configuration keys and their descriptions
+_VALID_SETTINGS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    'threshold': {
+        'description': 'Message count threshold for spontaneous generation',
+        'type': int,
+        'min': 1,
+        'max': 1000,
+        'db_key': 'message_threshold'
+    },
+    'spontaneous': {
+        'description': 'Cooldown in seconds between spontaneous messages',
+        'type': int,
+        'min': 0,
+        'max': 3600,
+        'db_key': 'spontaneous_cooldown'
+    },
+    'response': {
+        'description': 'Cooldown in seconds between responses to same user',
+        'type': int,
+        'min': 0,
+        'max': 3600,
+        'db_key': 'response_cooldown'
+    },
+    'context': {
+        'description': 'Maximum number of messages in context window',
+        'type': int,
+        'min': 10,
+        'max': 1000,
+        'db_key': 'context_limit'
+    },
+    'model': {
+        'description': 'Ollama model to use for this channel',
+        'type': str,
+        'db_key': 'ollama_model'
+    }
+})
+
+# Badges that allow changing channel configuration
+_PRIVILEGED_BADGES = frozenset(('broadcaster', 'moderator'))
+
+# Command names listed by the help message
+_HELP_COMMANDS = ", ".join(_VALID_SETTINGS) + ", status"
+
+# Model setting values that select the global default model
+_DEFAULT_MODEL_NAMES = frozenset(('default', 'global', 'none', ''))
+
+_SettingValidator = Callable[[str], Tuple[bool, str, Any]]
+
+
+def _make_int_validator(key: str, setting_info: Mapping[str, Any]) -> _SettingValidator:
+    """Build a validator for an integer setting with an optional range."""
+    minimum = setting_info.get('min')
+    maximum = setting_info.get('max')
+    
+    def validate(value_str: str) -> Tuple[bool, str, Any]:
+        try:
+            value = int(value_str)
+        except ValueError:
+            return False, f"Invalid value for {key}: {value_str}", None
+        
+        if minimum is not None and value < minimum:
+            return False, f"{key} must be at least {minimum}", None
+        if maximum is not None and value > maximum:
+            return False, f"{key} must be at most {maximum}", None
+        
+        return True, "", value
+    
+    return validate
+
+
+def _validate_str(value_str: str) -> Tuple[bool, str, Any]:
+    """Validate a free-form string setting."""
+    return True, "", value_str.strip()
+
+
+def _validate_model_name(value_str: str) -> Tuple[bool, str, Any]:
+    """Validate a model setting, mapping default aliases to None."""
+    value = value_str.strip()
+    if value.lower() in _DEFAULT_MODEL_NAMES:
+        return True, "", None  # Use global default
+    
+    # Basic model name validation
+    if not _MODEL_NAME_RE.match(value):
+        return False, "Model name contains invalid characters", None
+    
+    return True, "", value
+
+
+def _make_validator(key: str, setting_info: Mapping[str, Any]) -> _SettingValidator:
+    """Build the validator for a setting from its description."""
+    if setting_info['type'] == int:
+        return _make_int_validator(key, setting_info)
+    if key == 'model':
+        return _validate_model_name
+    if setting_info['type'] == str:
+        return _validate_str
+    return lambda value_str: (False, f"Unsupported setting type for {key}", None)
+
+
+@lru_cache(maxsize=8)
+def _format_model_list(models: Tuple[str, ...]) -> str:
+    """Format model names for a chat reply."""
+    return ", ".join(models)
+
 
 class ConfigurationManager:
     """Manages chat command processing and configuration validation."""
     
-    def __init__(self, channel_config_manager: ChannelConfigManager, ollama_client: OllamaClient):
+    # Seconds a fetched Ollama model list is reused
+    MODELS_CACHE_TTL = 15.0
+    
+    def __init__(self, channel_config_manager: ChannelConfigManager, ollama_client: OllamaClient,
+                 metrics_manager: Optional[MetricsManager] = None):
         """
         Initialize ConfigurationManager.
         
         Args:
             channel_config_manager: ChannelConfigManager instance
             ollama_client: OllamaClient instance for model validation
+            metrics_manager: MetricsManager used for status reports. One is
+                created on first status command if not given.
         """
         self.channel_config = channel_config_manager
         self.ollama_client = ollama_client
         
-        # Valid configuration keys and their descriptions
-        self.valid_settings = {
-            'threshold': {
-                'description': 'Message count threshold for spontaneous generation',
-                'type': int,
-                'min': 1,
-                'max': 1000,
-                'db_key': 'message_threshold'
-            },
-            'spontaneous': {
-                'description': 'Cooldown in seconds between spontaneous messages',
-                'type': int,
-                'min': 0,
-                'max': 3600,
-                'db_key': 'spontaneous_cooldown'
-            },
-            'response': {
-                'description': 'Cooldown in seconds between responses to same user',
-                'type': int,
-                'min': 0,
-                'max': 3600,
-                'db_key': 'response_cooldown'
-            },
-            'context': {
-                'description': 'Maximum number of messages in context window',
-                'type': int,
-                'min': 10,
-                'max': 1000,
-                'db_key': 'context_limit'
-            },
-            'model': {
-                'description': 'Ollama model to use for this channel',
-                'type': str,
-                'db_key': 'ollama_model'
-            }
+        # Recently fetched Ollama model list: (fetched_at, models)
+        self._models_cache: Optional[Tuple[float, List[str]]] = None
+        self._models_lock = asyncio.Lock()
+        
+        self._metrics_manager = metrics_manager
+        
+        # Valid configuration keys, shared by all instances
+        self.valid_settings = _VALID_SETTINGS
+        
+        # Command handlers by command name, called with (channel, user, parts)
+        self._handlers: Dict[str, Callable[[str, str, List[str]], Awaitable[str]]] = {
+            'status': self._run_status_command
+        }
+        for setting in self.valid_settings:
+            self._handlers[setting] = partial(self._run_setting_command, setting)
+        
+        # Value validators by setting key, specialized once per setting
+        self._validators: Dict[str, _SettingValidator] = {
+            key: _make_validator(key, info) for key, info in self.valid_settings.items()
         }
     
     async def process_chat_command(self, channel: str, user_display_name: str, 
@@ -83,39 +183,43 @@ class ConfigurationManager:
         """
         try:
             # Check user authorization
-            if not await self.check_user_permissions(channel, user_display_name, badges):
+            if not self.check_user_permissions(channel, user_display_name, badges):
                 return f"@{user_display_name} You need to be a moderator or broadcaster to use !clank commands."
             
-            # Parse command
-            parts = command.strip().split()
+            # Parse command, at most 3 tokens plus any unsplit remainder
+            parts = command.split(None, 3)
             if len(parts) < 2:
-                return await self._show_help(user_display_name)
-            
-            command_name = parts[1].lower()
-            
-            # Handle status command separately
-            if command_name == 'status':
-                return await self._handle_status_command(channel, user_display_name)
-            
-            # Handle configuration commands
-            if command_name in self.valid_settings:
-                if len(parts) == 2:
-                    # Show current value
-                    return await self._show_setting(channel, user_display_name, command_name)
-                elif len(parts) == 3:
-                    # Set new value
-                    return await self._set_setting(channel, user_display_name, command_name, parts[2])
-                else:
-                    return f"@{user_display_name} Usage: !clank {command_name} [value]"
-            else:
-                return await self._show_help(user_display_name)
+                return self._show_help(user_display_name)
+            
+            # Command names are usually typed in lowercase already
+            handler = self._handlers.get(parts[1]) or self._handlers.get(parts[1].lower())
+            if handler is None:
+                return self._show_help(user_display_name)
+            return await handler(channel, user_display_name, parts)
                 
         except Exception as e:
             logger.error(f"Error processing command '{command}' from {user_display_name} in {channel}: {e}")
             return f"@{user_display_name} An error occurred processing your command."
     
-    async def check_user_permissions(self, channel: str, user_display_name: str, 
-                                   badges: Dict[str, str]) -> bool:
+    async def _run_status_command(self, channel: str, user_display_name: str,
+                                  parts: List[str]) -> str:
+        """Dispatch !clank status."""
+        return await self._handle_status_command(channel, user_display_name)
+    
+    async def _run_setting_command(self, setting: str, channel: str,
+                                   user_display_name: str, parts: List[str]) -> str:
+        """Dispatch !clank <setting> [value] to show or set a setting."""
+        if len(parts) == 2:
+            # Show current value
+            return await self._show_setting(channel, user_display_name, setting)
+        elif len(parts) == 3:
+            # Set new value
+            return await self._set_setting(channel, user_display_name, setting, parts[2])
+        else:
+            return f"@{user_display_name} Usage: !clank {setting} [value]"
+    
+    def check_user_permissions(self, channel: str, user_display_name: str, 
+                             badges: Dict[str, str]) -> bool:
         """
         Check if user has permission to modify configuration.
         
@@ -139,20 +243,11 @@ class ConfigurationManager:
         Returns:
             bool: True if user is broadcaster or moderator
         """
-        # Check for broadcaster badge (channel owner)
-        if 'broadcaster' in badges:
-            return True
-        
-        # Check for moderator badge
-        if 'moderator' in badges:
-            return True
-        
-        return False
+        return not _PRIVILEGED_BADGES.isdisjoint(badges)
     
-    async def _show_help(self, user_display_name: str) -> str:
+    def _show_help(self, user_display_name: str) -> str:
         """Show help message with available commands."""
-        help_text = f"@{user_display_name} Available !clank commands: " + ", ".join(self.valid_settings.keys()) + ", status"
-        return help_text
+        return f"@{user_display_name} Available !clank commands: {_HELP_COMMANDS}"
     
     async def _show_setting(self, channel: str, user_display_name: str, setting: str) -> str:
         """Show current value of a configuration setting."""
@@ -220,42 +315,55 @@ class ConfigurationManager:
         Returns:
             Tuple of (is_valid, error_message, converted_value)
         """
-        if key not in self.valid_settings:
+        validator = self._validators.get(key)
+        if validator is None:
             return False, f"Unknown setting: {key}", None
+        return validator(value_str)
+    
+    def _get_cached_models(self) -> Optional[List[str]]:
+        """Get the cached model list if it has not expired."""
+        cached = self._models_cache
+        if cached and time.monotonic() - cached[0] < self.MODELS_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    async def _get_available_models(self) -> List[str]:
+        """
+        Get the Ollama model list, reusing a recent fetch.
         
-        setting_info = self.valid_settings[key]
+        Concurrent callers share a single request to Ollama.
         
-        try:
-            if setting_info['type'] == int:
-                value = int(value_str)
-                
-                # Check range if specified
-                if 'min' in setting_info and value < setting_info['min']:
-                    return False, f"{key} must be at least {setting_info['min']}", None
-                if 'max' in setting_info and value > setting_info['max']:
-                    return False, f"{key} must be at most {setting_info['max']}", None
-                
-                return True, "", value
-                
-            elif setting_info['type'] == str:
-                value = value_str.strip()
-                
-                # Special validation for model names
-                if key == 'model':
-                    if value.lower() in ['default', 'global', 'none', '']:
-                        return True, "", None  # Use global default
-                    
-                    # Basic model name validation
-                    if not re.match(r'^[a-zA-Z0-9._-]+$', value):
-                        return False, "Model name contains invalid characters", None
-                
-                return True, "", value
+        Returns:
+            List of model names
             
-            else:
-                return False, f"Unsupported setting type for {key}", None
-                
-        except ValueError as e:
-            return False, f"Invalid value for {key}: {value_str}", None
+        Raises:
+            OllamaError: If unable to retrieve models
+        """
+        models = self._get_cached_models()
+        if models is not None:
+            return models
+        
+        async with self._models_lock:
+            # Another caller may have fetched while we waited
+            models = self._get_cached_models()
+            if models is not None:
+                return models
+            
+            return await self._fetch_models()
+    
+    async def _fetch_models(self) -> List[str]:
+        """
+        Request the model list from Ollama and cache it.
+        
+        Returns:
+            List of model names
+            
+        Raises:
+            OllamaError: If unable to retrieve models
+        """
+        models = await self.ollama_client.list_available_models()
+        self._models_cache = (time.monotonic(), models)
+        return models
     
     async def validate_model_change(self, model_name: Optional[str]) -> Tuple[bool, str]:
         """
@@ -271,15 +379,14 @@ class ConfigurationManager:
             return True, "Using global default model"
         
         try:
-            # Check if model is available
-            is_available = await self.ollama_client.validate_model(model_name)
+            # One model list fetch answers both availability and suggestions
+            available_models = await self._get_available_models()
             
-            if is_available:
+            if model_name in available_models:
                 return True, f"Model {model_name} is available"
             else:
-                available_models = await self.ollama_client.list_available_models()
                 if available_models:
-                    models_list = ", ".join(available_models[:5])  # Show first 5 models
+                    models_list = _format_model_list(tuple(available_models[:5]))  # Show first 5 models
                     return False, f"Model {model_name} not found. Available models: {models_list}"
                 else:
                     return False, f"Model {model_name} not found and could not retrieve available models"
@@ -327,9 +434,10 @@ class ConfigurationManager:
     async def _get_ollama_status(self, config) -> tuple:
         """Get Ollama connectivity status and model information."""
         try:
-            start_time = datetime.now()
-            available_models = await self.ollama_client.list_available_models()
-            response_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            # Always ask Ollama so the status and latency are live, not cached
+            start_ns = time.perf_counter_ns()
+            available_models = await self._fetch_models()
+            response_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             if available_models:
                 current_model = config.ollama_model or "default"
@@ -348,7 +456,9 @@ class ConfigurationManager:
                 return "Connected (no models)", "No models available", response_time
                 
         except Exception as e:
-            error_msg = str(e)[:30] + "..." if len(str(e)) > 30 else str(e)
+            error_msg = str(e)
+            if len(error_msg) > 30:
+                error_msg = error_msg[:30] + "..."
             return "Disconnected", f"Error: {error_msg}", None
     
     async def _get_performance_info(self, channel: str) -> Optional[str]:
@@ -356,26 +466,24 @@ class ConfigurationManager:
         try:
             # Try to get metrics manager from channel config manager
             if hasattr(self.channel_config, 'db_manager'):
-                from ..database.operations import MetricsManager
-                metrics_manager = MetricsManager(self.channel_config.db_manager)
+                if self._metrics_manager is None:
+                    self._metrics_manager = MetricsManager(self.channel_config.db_manager)
                 
                 # Get recent performance stats (last 24 hours)
-                stats = await metrics_manager.get_performance_stats(channel, hours=24)
+                stats = await self._metrics_manager.get_performance_stats(channel, hours=24)
                 
                 if stats:
+                    metrics = stats['metrics']
                     perf_parts = []
                     
                     # Response time stats
-                    if 'response_time' in stats:
-                        avg_time = stats['response_time']['average']
+                    if 'response_time' in metrics:
+                        avg_time = metrics['response_time']['average']
                         perf_parts.append(f"Avg: {avg_time:.1f}s")
                     
                     # Success/error counts
-                    success_count = stats.get('success_count', {}).get('count', 0)
-                    error_counts = sum(
-                        stat['count'] for key, stat in stats.items() 
-                        if key.startswith('error_')
-                    )
+                    success_count = metrics.get('success_count', {}).get('count', 0)
+                    error_counts = sum(stat['count'] for stat in stats['errors'].values())
                     
                     if success_count > 0 or error_counts > 0:
                         total_ops = success_count + error_counts
@@ -397,9 +505,8 @@ class ConfigurationManager:
             cooldown_parts = []
             
             # Spontaneous cooldown status
-            if config.last_spontaneous_message:
-                time_since = datetime.now() - config.last_spontaneous_message
-                remaining = max(0, config.spontaneous_cooldown - int(time_since.total_seconds()))
+            if config.last_spontaneous_ts:
+                remaining = max(0, config.spontaneous_cooldown - int(time.time() - config.last_spontaneous_ts))
                 if remaining > 0:
                     cooldown_parts.append(f"Spont: {remaining}s")
                 else:
@@ -5,18 +5,38 @@ This module handles loading and validation of environment variables
 and global application settings.
 """
 
+import asyncio
 import os
 import logging
+import re
+import sys
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Any, Mapping, Tuple
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Channel names in TWITCH_CHANNELS, separated by commas and/or whitespace
+_CHANNEL_RE = re.compile(r'[^\s,]+')
+
+_VALID_LOG_LEVELS = frozenset(('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'))
+_VALID_LOG_FORMATS = frozenset(('console', 'json'))
+_VALID_DB_TYPES = frozenset(('sqlite', 'mysql'))
+_VALID_SQLITE_SYNCHRONOUS = frozenset(('OFF', 'NORMAL', 'FULL', 'EXTRA'))
+
+
+@dataclass(frozen=True, **_SLOTS)
 class GlobalConfig:
-    """Global configuration settings loaded from environment variables."""
+    """
+    Global configuration settings loaded from environment variables.
+    
+    Instances are frozen since load_global_config shares one per process,
+    and are validated on construction.
+    """
     
     # Required fields (no defaults)
     database_type: str
@@ -26,7 +46,7 @@ class GlobalConfig:
     ollama_timeout: int
     twitch_client_id: str
     twitch_client_secret: str
-    channels: List[str]
+    channels: Tuple[str, ...]
     content_filter_enabled: bool
     blocked_words_file: str
     log_level: str
@@ -38,31 +58,94 @@ class GlobalConfig:
     mysql_user: Optional[str] = None
     mysql_password: Optional[str] = None
     mysql_database: Optional[str] = None
+    database_synchronous: str = 'NORMAL'  # SQLite PRAGMA synchronous level
+    
+    def __post_init__(self):
+        self.validate()
+    
+    def validate(self) -> None:
+        """
+        Validate configuration values for consistency and correctness.
+        
+        Raises:
+            ValueError: If configuration is invalid
+        """
+        if self.log_level not in _VALID_LOG_LEVELS:
+            raise ValueError(f"Invalid log level: {self.log_level}")
+        
+        if self.log_format not in _VALID_LOG_FORMATS:
+            raise ValueError(f"Invalid log format: {self.log_format}")
+        
+        if self.database_type not in _VALID_DB_TYPES:
+            raise ValueError(f"Invalid database type: {self.database_type}")
+        
+        if self.database_synchronous not in _VALID_SQLITE_SYNCHRONOUS:
+            raise ValueError(f"Invalid database synchronous mode: {self.database_synchronous}")
+        
+        # Validate timeout values
+        if self.ollama_timeout <= 0:
+            raise ValueError("Ollama timeout must be positive")
+        
+        if self.mysql_port <= 0 or self.mysql_port > 65535:
+            raise ValueError("MySQL port must be between 1 and 65535")
+
+
+# Configuration loaded by the first load_global_config call
+_global_config: Optional[GlobalConfig] = None
 
 
 def load_global_config() -> GlobalConfig:
     """
     Load global configuration from environment variables.
     
+    The .env file and environment are only read on the first call, later
+    calls return the same configuration. Use reload_global_config to pick
+    up changes.
+    
     Returns:
         GlobalConfig: Loaded and validated configuration
         
     Raises:
         ValueError: If required environment variables are missing or invalid
     """
+    global _global_config
+    if _global_config is None:
+        _global_config = _read_global_config()
+    return _global_config
+
+
+def reload_global_config() -> GlobalConfig:
+    """
+    Discard the loaded configuration and read it again.
+    
+    Returns:
+        GlobalConfig: Freshly loaded configuration
+        
+    Raises:
+        ValueError: If required environment variables are missing or invalid
+    """
+    global _global_config
+    _global_config = None
+    return load_global_config()
+
+
+def _read_global_config() -> GlobalConfig:
+    """Read global configuration from the .env file and environment."""
     # Load environment variables from .env file if present
     load_dotenv()
+    env = os.environ
     
     # Database configuration
-    database_type = os.getenv('DATABASE_TYPE', 'sqlite').lower()
-    database_url = os.getenv('DATABASE_URL', './chatbot.db')
+    database_type = env.get('DATABASE_TYPE', 'sqlite').lower()
+    database_url = env.get('DATABASE_URL', './chatbot.db')
+    database_synchronous = env.get('DATABASE_SYNCHRONOUS', 'NORMAL').upper()
     
     # MySQL configuration (only required if using MySQL)
-    mysql_host = os.getenv('MYSQL_HOST')
-    mysql_port = int(os.getenv('MYSQL_PORT', '3306'))
-    mysql_user = os.getenv('MYSQL_USER')
-    mysql_password = os.getenv('MYSQL_PASSWORD')
-    mysql_database = os.getenv('MYSQL_DATABASE')
+    mysql_host = env.get('MYSQL_HOST')
+    mysql_port = int(env.get('MYSQL_PORT', '3306'))
+    mysql_user = env.get('MYSQL_USER')
+    mysql_password = env.get('MYSQL_PASSWORD')
+    mysql_database = env.get('MYSQL_DATABASE')
     
     # Validate MySQL configuration if using MySQL
     if database_type == 'mysql':
@@ -73,16 +156,16 @@ def load_global_config() -> GlobalConfig:
             )
     
     # Ollama configuration
-    ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
-    ollama_model = os.getenv('OLLAMA_MODEL')
+    ollama_url = env.get('OLLAMA_URL', 'http://localhost:11434')
+    ollama_model = env.get('OLLAMA_MODEL')
     if not ollama_model:
         raise ValueError("OLLAMA_MODEL environment variable is required")
     
-    ollama_timeout = int(os.getenv('OLLAMA_TIMEOUT', '30'))
+    ollama_timeout = int(env.get('OLLAMA_TIMEOUT', '30'))
     
     # Twitch configuration
-    twitch_client_id = os.getenv('TWITCH_CLIENT_ID')
-    twitch_client_secret = os.getenv('TWITCH_CLIENT_SECRET')
+    twitch_client_id = env.get('TWITCH_CLIENT_ID')
+    twitch_client_secret = env.get('TWITCH_CLIENT_SECRET')
     
     if not twitch_client_id or not twitch_client_secret:
         raise ValueError(
@@ -90,24 +173,27 @@ def load_global_config() -> GlobalConfig:
             "TWITCH_CLIENT_SECRET"
         )
     
-    # Parse channels list
-    channels_str = os.getenv('TWITCH_CHANNELS', '')
-    channels = [ch.strip() for ch in channels_str.split(',') if ch.strip()]
+    # Parse channels list; Twitch channel names are case-insensitive and
+    # arrive lowercase from IRC, so normalise them once here and drop
+    # repeats while keeping the configured order
+    channels_str = env.get('TWITCH_CHANNELS', '')
+    channels = tuple(dict.fromkeys(map(sys.intern, _CHANNEL_RE.findall(channels_str.lower()))))
     
     if not channels:
         raise ValueError("At least one channel must be specified in TWITCH_CHANNELS")
     
     # Content filtering configuration
-    content_filter_enabled = os.getenv('CONTENT_FILTER_ENABLED', 'true').lower() == 'true'
-    blocked_words_file = os.getenv('BLOCKED_WORDS_FILE', './blocked_words.txt')
+    content_filter_enabled = env.get('CONTENT_FILTER_ENABLED', 'true').lower() == 'true'
+    blocked_words_file = env.get('BLOCKED_WORDS_FILE', './blocked_words.txt')
     
     # Logging configuration
-    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-    log_format = os.getenv('LOG_FORMAT', 'console')  # 'console' or 'json'
+    log_level = env.get('LOG_LEVEL', 'INFO').upper()
+    log_format = env.get('LOG_FORMAT', 'console')  # 'console' or 'json'
     
     return GlobalConfig(
         database_type=database_type,
         database_url=database_url,
+        database_synchronous=database_synchronous,
         mysql_host=mysql_host,
         mysql_port=mysql_port,
         mysql_user=mysql_user,
@@ -130,33 +216,16 @@ def validate_config(config: GlobalConfig) -> None:
     """
     Validate configuration values for consistency and correctness.
     
+    GlobalConfig validates itself when constructed, so this only re-runs
+    those checks for callers that still validate explicitly.
+    
     Args:
         config: Configuration to validate
         
     Raises:
         ValueError: If configuration is invalid
     """
-    # Validate log level
-    valid_log_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
-    if config.log_level not in valid_log_levels:
-        raise ValueError(f"Invalid log level: {config.log_level}")
-    
-    # Validate log format
-    valid_log_formats = ['console', 'json']
-    if config.log_format not in valid_log_formats:
-        raise ValueError(f"Invalid log format: {config.log_format}")
-    
-    # Validate database type
-    valid_db_types = ['sqlite', 'mysql']
-    if config.database_type not in valid_db_types:
-        raise ValueError(f"Invalid database type: {config.database_type}")
-    
-    # Validate timeout values
-    if config.ollama_timeout <= 0:
-        raise ValueError("Ollama timeout must be positive")
-    
-    if config.mysql_port <= 0 or config.mysql_port > 65535:
-        raise ValueError("MySQL port must be between 1 and 65535")
+    config.validate()
 
 
 class ConfigurationSystem:
@@ -177,6 +246,23 @@ class ConfigurationSystem:
         """
         self.global_config = global_config
         self.channel_config_manager = channel_config_manager
+        self._defaults: Mapping[str, Any] = MappingProxyType({
+            'database_type': global_config.database_type,
+            'database_url': global_config.database_url,
+            'ollama_url': global_config.ollama_url,
+            'ollama_timeout': global_config.ollama_timeout,
+            'ollama_model': global_config.ollama_model,
+            'content_filter_enabled': global_config.content_filter_enabled,
+            'blocked_words_file': global_config.blocked_words_file,
+            'log_level': global_config.log_level,
+            'log_format': global_config.log_format,
+            'message_threshold': 30,
+            'spontaneous_cooldown': 300,
+            'response_cooldown': 60,
+            'context_limit': 200,
+            'message_count': 0,
+            'last_spontaneous_message': None,
+        })
         
         logger.info("Configuration system initialized", extra={
             'database_type': global_config.database_type,
@@ -185,22 +271,25 @@ class ConfigurationSystem:
             'channels': len(global_config.channels)
         })
     
-    async def get_effective_config(self, channel: str) -> Dict[str, Any]:
+    async def get_effective_config(self, channel: str) -> Mapping[str, Any]:
         """
         Get effective configuration for a channel (channel-specific + global fallbacks).
         
+        Built on every call from ChannelConfigManager's cached, write-through
+        configuration, so updates are visible immediately.
+        
         Args:
             channel: Channel name
             
         Returns:
-            Dictionary with effective configuration values
+            Read-only mapping with effective configuration values
         """
         try:
             # Get channel-specific configuration
             channel_config = await self.channel_config_manager.get_config(channel)
             
             # Build effective configuration with fallbacks
-            effective_config = {
+            effective_config = MappingProxyType({
                 # Global settings (no channel override)
                 'database_type': self.global_config.database_type,
                 'database_url': self.global_config.database_url,
@@ -221,7 +310,7 @@ class ConfigurationSystem:
                 # Channel state
                 'message_count': channel_config.message_count,
                 'last_spontaneous_message': channel_config.last_spontaneous_message,
-            }
+            })
             
             return effective_config
             
@@ -230,25 +319,9 @@ class ConfigurationSystem:
             # Return global defaults on error
             return self._get_global_defaults()
     
-    def _get_global_defaults(self) -> Dict[str, Any]:
+    def _get_global_defaults(self) -> Mapping[str, Any]:
         """Get global default configuration values."""
-        return {
-            'database_type': self.global_config.database_type,
-            'database_url': self.global_config.database_url,
-            'ollama_url': self.global_config.ollama_url,
-            'ollama_timeout': self.global_config.ollama_timeout,
-            'ollama_model': self.global_config.ollama_model,
-            'content_filter_enabled': self.global_config.content_filter_enabled,
-            'blocked_words_file': self.global_config.blocked_words_file,
-            'log_level': self.global_config.log_level,
-            'log_format': self.global_config.log_format,
-            'message_threshold': 30,
-            'spontaneous_cooldown': 300,
-            'response_cooldown': 60,
-            'context_limit': 200,
-            'message_count': 0,
-            'last_spontaneous_message': None,
-        }
+        return self._defaults
     
     async def initialize_channel_configs(self) -> bool:
         """
@@ -259,11 +332,20 @@ class ConfigurationSystem:
         """
         try:
             success_count = 0
+            channels = self.global_config.channels
+            
+            # This will create default config for any channel without one
+            results = await asyncio.gather(
+                *(self.channel_config_manager.get_config(channel) for channel in channels),
+                return_exceptions=True
+            )
             
-            for channel in self.global_config.channels:
-                try:
-                    # This will create default config if it doesn't exist
-                    config = await self.channel_config_manager.get_config(channel)
+            for channel, config in zip(channels, results):
+                if isinstance(config, Exception):
+                    logger.error(f"Failed to initialize config for {channel}: {config}")
+                    continue
+                
+                if logger.isEnabledFor(logging.INFO):
                     logger.info(f"Channel configuration loaded", extra={
                         'channel': channel,
                         'threshold': config.message_threshold,
@@ -271,15 +353,12 @@ class ConfigurationSystem:
                         'response_cooldown': config.response_cooldown,
                         'model': config.ollama_model or 'default'
                     })
-                    success_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to initialize config for {channel}: {e}")
+                success_count += 1
             
             logger.info(f"Channel configuration initialization complete", extra={
-                'total_channels': len(self.global_config.channels),
+                'total_channels': len(channels),
                 'successful': success_count,
-                'failed': len(self.global_config.channels) - success_count
+                'failed': len(channels) - success_count
             })
             
             return success_count > 0
@@ -296,18 +375,22 @@ class ConfigurationSystem:
             bool: True if successful, False otherwise
         """
         try:
-            for channel in self.global_config.channels:
-                try:
-                    # Load channel configuration (includes persistent state)
-                    config = await self.channel_config_manager.get_config(channel)
-                    
+            channels = self.global_config.channels
+            
+            # Load channel configurations (includes persistent state)
+            results = await asyncio.gather(
+                *(self.channel_config_manager.get_config(channel) for channel in channels),
+                return_exceptions=True
+            )
+            
+            for channel, config in zip(channels, results):
+                if isinstance(config, Exception):
+                    logger.warning(f"Failed to load persistent state for {channel}: {config}")
+                elif logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"Loaded persistent state for {channel}", extra={
                         'message_count': config.message_count,
                         'last_spontaneous': config.last_spontaneous_message.isoformat() if config.last_spontaneous_message else None
                     })
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to load persistent state for {channel}: {e}")
             
             return True
             
@@ -6,13 +6,180 @@ for both SQLite and MySQL databases.
 """
 
 import sqlite3
-import mysql.connector
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Per-connection SQLite tuning; WAL is set once in _initialize_sqlite since
+# the journal mode is stored in the database file
+SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+# SQLite table creation statements
+_SQLITE_SCHEMA = (
+    # Core message storage
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY,
+        message_id TEXT UNIQUE NOT NULL,
+        channel TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        user_display_name TEXT NOT NULL,
+        message_content TEXT NOT NULL,
+        timestamp DATETIME NOT NULL
+    )
+    """,
+    
+    # Channel-specific configuration
+    """
+    CREATE TABLE IF NOT EXISTS channel_config (
+        channel TEXT PRIMARY KEY,
+        message_threshold INTEGER DEFAULT 30,
+        spontaneous_cooldown INTEGER DEFAULT 300,
+        response_cooldown INTEGER DEFAULT 60,
+        context_limit INTEGER DEFAULT 200,
+        ollama_model TEXT,
+        message_count INTEGER DEFAULT 0,
+        last_spontaneous_message DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    
+    # Per-user response cooldowns (channel-specific)
+    """
+    CREATE TABLE IF NOT EXISTS user_response_cooldowns (
+        id INTEGER PRIMARY KEY,
+        channel TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        last_response_time DATETIME NOT NULL,
+        UNIQUE(channel, user_id)
+    )
+    """,
+    
+    # Performance and monitoring metrics
+    """
+    CREATE TABLE IF NOT EXISTS bot_metrics (
+        id INTEGER PRIMARY KEY,
+        channel TEXT NOT NULL,
+        metric_type TEXT NOT NULL,
+        metric_value REAL NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    
+    # OAuth token storage
+    """
+    CREATE TABLE IF NOT EXISTS auth_tokens (
+        id INTEGER PRIMARY KEY,
+        access_token TEXT NOT NULL,
+        refresh_token TEXT,
+        expires_at DATETIME,
+        bot_username TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+# MySQL table creation statements
+_MYSQL_SCHEMA = (
+    # Core message storage
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        message_id VARCHAR(255) UNIQUE NOT NULL,
+        channel VARCHAR(255) NOT NULL,
+        user_id VARCHAR(255) NOT NULL,
+        user_display_name VARCHAR(255) NOT NULL,
+        message_content TEXT NOT NULL,
+        timestamp DATETIME NOT NULL
+    )
+    """,
+    
+    # Channel-specific configuration
+    """
+    CREATE TABLE IF NOT EXISTS channel_config (
+        channel VARCHAR(255) PRIMARY KEY,
+        message_threshold INT DEFAULT 30,
+        spontaneous_cooldown INT DEFAULT 300,
+        response_cooldown INT DEFAULT 60,
+        context_limit INT DEFAULT 200,
+        ollama_model VARCHAR(255),
+        message_count INT DEFAULT 0,
+        last_spontaneous_message DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """,
+    
+    # Per-user response cooldowns (channel-specific)
+    """
+    CREATE TABLE IF NOT EXISTS user_response_cooldowns (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        channel VARCHAR(255) NOT NULL,
+        user_id VARCHAR(255) NOT NULL,
+        last_response_time DATETIME NOT NULL,
+        UNIQUE KEY unique_channel_user (channel, user_id)
+    )
+    """,
+    
+    # Performance and monitoring metrics
+    """
+    CREATE TABLE IF NOT EXISTS bot_metrics (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        channel VARCHAR(255) NOT NULL,
+        metric_type VARCHAR(255) NOT NULL,
+        metric_value DOUBLE NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    
+    # OAuth token storage
+    """
+    CREATE TABLE IF NOT EXISTS auth_tokens (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        access_token TEXT NOT NULL,
+        refresh_token TEXT,
+        expires_at DATETIME,
+        bot_username VARCHAR(255),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+# SQLite index creation statements
+_SQLITE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_messages_channel_timestamp ON messages (channel, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages (message_id)",
+    # User lookups are always scoped to a channel
+    "DROP INDEX IF EXISTS idx_messages_user_id",
+    "CREATE INDEX IF NOT EXISTS idx_messages_channel_user ON messages (channel, user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_cooldowns_channel_user ON user_response_cooldowns (channel, user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bot_metrics_channel_metric_time ON bot_metrics (channel, metric_type, timestamp)",
+)
+
+# MySQL index creation statements
+_MYSQL_INDEXES = (
+    "CREATE INDEX idx_messages_channel_timestamp ON messages (channel, timestamp)",
+    "CREATE INDEX idx_messages_message_id ON messages (message_id)",
+    "CREATE INDEX idx_messages_channel_user ON messages (channel, user_id)",
+    "CREATE INDEX idx_user_cooldowns_channel_user ON user_response_cooldowns (channel, user_id)",
+    "CREATE INDEX idx_bot_metrics_channel_metric_time ON bot_metrics (channel, metric_type, timestamp)",
+)
+
+# MySQL indexes dropped from existing databases: (table, index)
+_MYSQL_OBSOLETE_INDEXES = (
+    # Replaced by idx_messages_channel_user
+    ('messages', 'idx_messages_user_id'),
+)
+
 
 class DatabaseMigrations:
     """Handles database schema creation and migrations."""
@@ -56,17 +223,15 @@ class DatabaseMigrations:
         
         conn = sqlite3.connect(database_path)
         try:
-            cursor = conn.cursor()
-            
-            # Create all tables
-            for table_sql in self._get_sqlite_schema():
-                cursor.execute(table_sql)
+            # Journal mode cannot change inside a transaction, so set it first
+            conn.execute("PRAGMA journal_mode=WAL")
+            for pragma in SQLITE_CONNECTION_PRAGMAS:
+                conn.execute(pragma)
             
-            # Create indexes
-            for index_sql in self._get_sqlite_indexes():
-                cursor.execute(index_sql)
+            # Create all tables and indexes in a single script and transaction
+            statements = self._get_sqlite_schema() + self._get_sqlite_indexes()
+            conn.executescript("BEGIN;\n" + ";\n".join(statements) + ";\nCOMMIT;")
             
-            conn.commit()
             logger.info(f"SQLite database initialized at {database_path}")
             return True
             
@@ -79,6 +244,9 @@ class DatabaseMigrations:
     
     async def _initialize_mysql(self) -> bool:
         """Initialize MySQL database and create schema."""
+        # Imported here so SQLite deployments never load the MySQL driver
+        import mysql.connector
+        
         try:
             # Connect to MySQL server
             conn = mysql.connector.connect(
@@ -99,6 +267,11 @@ class DatabaseMigrations:
             for table_sql in self._get_mysql_schema():
                 cursor.execute(table_sql)
             
+            # MySQL has no DROP INDEX IF EXISTS, so check before dropping
+            for table, index in _MYSQL_OBSOLETE_INDEXES:
+                if self._mysql_index_exists(cursor, database_name, table, index):
+                    cursor.execute(f"DROP INDEX {index} ON {table}")
+            
             # Create indexes
             for index_sql in self._get_mysql_indexes():
                 cursor.execute(index_sql)
@@ -116,156 +289,39 @@ class DatabaseMigrations:
             if 'conn' in locals():
                 conn.close()
     
-    def _get_sqlite_schema(self) -> list[str]:
-        """Get SQLite table creation statements."""
-        return [
-            # Core message storage
-            """
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id TEXT UNIQUE NOT NULL,
-                channel TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                user_display_name TEXT NOT NULL,
-                message_content TEXT NOT NULL,
-                timestamp DATETIME NOT NULL
-            )
-            """,
-            
-            # Channel-specific configuration
-            """
-            CREATE TABLE IF NOT EXISTS channel_config (
-                channel TEXT PRIMARY KEY,
-                message_threshold INTEGER DEFAULT 30,
-                spontaneous_cooldown INTEGER DEFAULT 300,
-                response_cooldown INTEGER DEFAULT 60,
-                context_limit INTEGER DEFAULT 200,
-                ollama_model TEXT,
-                message_count INTEGER DEFAULT 0,
-                last_spontaneous_message DATETIME,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """,
-            
-            # Per-user response cooldowns (channel-specific)
-            """
-            CREATE TABLE IF NOT EXISTS user_response_cooldowns (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                channel TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                last_response_time DATETIME NOT NULL,
-                UNIQUE(channel, user_id)
-            )
-            """,
-            
-            # Performance and monitoring metrics
-            """
-            CREATE TABLE IF NOT EXISTS bot_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                channel TEXT NOT NULL,
-                metric_type TEXT NOT NULL,
-                metric_value REAL NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """,
+    @staticmethod
+    def _mysql_index_exists(cursor, database: str, table: str, index: str) -> bool:
+        """
+        Check whether a MySQL table has an index.
+        
+        Args:
+            cursor: Cursor on the MySQL server
+            database: Database name
+            table: Table name
+            index: Index name
             
-            # OAuth token storage
-            """
-            CREATE TABLE IF NOT EXISTS auth_tokens (
-                id INTEGER PRIMARY KEY,
-                access_token TEXT NOT NULL,
-                refresh_token TEXT,
-                expires_at DATETIME,
-                bot_username TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        ]
+        Returns:
+            bool: True if the index exists, False otherwise
+        """
+        cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = %s AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, (database, table, index))
+        return cursor.fetchone() is not None
+    
+    def _get_sqlite_schema(self) -> Tuple[str, ...]:
+        """Get SQLite table creation statements."""
+        return _SQLITE_SCHEMA
     
-    def _get_mysql_schema(self) -> list[str]:
+    def _get_mysql_schema(self) -> Tuple[str, ...]:
         """Get MySQL table creation statements."""
-        return [
-            # Core message storage
-            """
-            CREATE TABLE IF NOT EXISTS messages (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                message_id VARCHAR(255) UNIQUE NOT NULL,
-                channel VARCHAR(255) NOT NULL,
-                user_id VARCHAR(255) NOT NULL,
-                user_display_name VARCHAR(255) NOT NULL,
-                message_content TEXT NOT NULL,
-                timestamp DATETIME NOT NULL
-            )
-            """,
-            
-            # Channel-specific configuration
-            """
-            CREATE TABLE IF NOT EXISTS channel_config (
-                channel VARCHAR(255) PRIMARY KEY,
-                message_threshold INT DEFAULT 30,
-                spontaneous_cooldown INT DEFAULT 300,
-                response_cooldown INT DEFAULT 60,
-                context_limit INT DEFAULT 200,
-                ollama_model VARCHAR(255),
-                message_count INT DEFAULT 0,
-                last_spontaneous_message DATETIME,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-            """,
-            
-            # Per-user response cooldowns (channel-specific)
-            """
-            CREATE TABLE IF NOT EXISTS user_response_cooldowns (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                channel VARCHAR(255) NOT NULL,
-                user_id VARCHAR(255) NOT NULL,
-                last_response_time DATETIME NOT NULL,
-                UNIQUE KEY unique_channel_user (channel, user_id)
-            )
-            """,
-            
-            # Performance and monitoring metrics
-            """
-            CREATE TABLE IF NOT EXISTS bot_metrics (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                channel VARCHAR(255) NOT NULL,
-                metric_type VARCHAR(255) NOT NULL,
-                metric_value DECIMAL(10,4) NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """,
-            
-            # OAuth token storage
-            """
-            CREATE TABLE IF NOT EXISTS auth_tokens (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                access_token TEXT NOT NULL,
-                refresh_token TEXT,
-                expires_at DATETIME,
-                bot_username VARCHAR(255),
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        ]
+        return _MYSQL_SCHEMA
     
-    def _get_sqlite_indexes(self) -> list[str]:
+    def _get_sqlite_indexes(self) -> Tuple[str, ...]:
         """Get SQLite index creation statements."""
-        return [
-            "CREATE INDEX IF NOT EXISTS idx_messages_channel_timestamp ON messages (channel, timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages (message_id)",
-            "CREATE INDEX IF NOT EXISTS idx_messages_user_id ON messages (user_id)",
-            "CREATE INDEX IF NOT EXISTS idx_user_cooldowns_channel_user ON user_response_cooldowns (channel, user_id)",
-            "CREATE INDEX IF NOT EXISTS idx_bot_metrics_channel_metric_time ON bot_metrics (channel, metric_type, timestamp)"
-        ]
+        return _SQLITE_INDEXES
     
-    def _get_mysql_indexes(self) -> list[str]:
+    def _get_mysql_indexes(self) -> Tuple[str, ...]:
         """Get MySQL index creation statements."""
-        return [
-            "CREATE INDEX idx_messages_channel_timestamp ON messages (channel, timestamp)",
-            "CREATE INDEX idx_messages_message_id ON messages (message_id)",
-            "CREATE INDEX idx_messages_user_id ON messages (user_id)",
-            "CREATE INDEX idx_user_cooldowns_channel_user ON user_response_cooldowns (channel, user_id)",
-            "CREATE INDEX idx_bot_metrics_channel_metric_time ON bot_metrics (channel, metric_type, timestamp)"
-        ]
\ No newline at end of file
+        return _MYSQL_INDEXES
@@ -7,11 +7,15 @@ configuration, and authentication.
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Union
 import json
+import sys
 
+# Slotted dataclasses need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class Message:
     """Represents a chat message stored in the database."""
     id: Optional[int]
@@ -34,9 +38,19 @@ class Message:
             message_content=row[5],
             timestamp=row[6] if isinstance(row[6], datetime) else datetime.fromisoformat(str(row[6]))
         )
+    
+    @classmethod
+    def from_db_rows(cls, rows: Iterable[tuple]) -> List['Message']:
+        """
+        Create Message instances from database rows in bulk.
+        
+        Rows must come from a connection that returns DATETIME columns as
+        datetime objects (MySQL, or SQLite with the registered converter).
+        """
+        return [cls(*row) for row in rows]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ChannelConfig:
     """Represents channel-specific configuration."""
     channel: str
@@ -50,6 +64,13 @@ class ChannelConfig:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
+    @property
+    def last_spontaneous_ts(self) -> Optional[float]:
+        """Unix timestamp of last_spontaneous_message, for cooldown math."""
+        if self.last_spontaneous_message is None:
+            return None
+        return self.last_spontaneous_message.timestamp()
+    
     @classmethod
     def from_db_row(cls, row: tuple) -> 'ChannelConfig':
         """Create ChannelConfig instance from database row."""
@@ -83,7 +104,7 @@ class ChannelConfig:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class UserResponseCooldown:
     """Represents per-user response cooldown tracking."""
     id: Optional[int]
@@ -102,7 +123,7 @@ class UserResponseCooldown:
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BotMetric:
     """Represents bot performance metrics."""
     id: Optional[int]
@@ -123,16 +144,30 @@ class BotMetric:
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AuthToken:
     """Represents OAuth authentication tokens."""
     id: Optional[int]
     access_token: str
     refresh_token: Optional[str]
-    expires_at: Optional[datetime]
+    expires_at: Optional[Union[datetime, int]]  # datetime or Unix timestamp
     bot_username: Optional[str]
     created_at: Optional[datetime]
     
+    @staticmethod
+    def _parse_expires_at(value: Any) -> Optional[Union[datetime, int]]:
+        """Parse a stored expiry, keeping Unix timestamps as integers."""
+        if not value:
+            return None
+        if isinstance(value, (datetime, int)):
+            return value
+        if isinstance(value, float):
+            return int(value)
+        value = str(value)
+        if value.isdigit():
+            return int(value)
+        return datetime.fromisoformat(value)
+    
     @classmethod
     def from_db_row(cls, row: tuple) -> 'AuthToken':
         """Create AuthToken instance from database row."""
@@ -140,14 +175,14 @@ class AuthToken:
             id=row[0],
             access_token=row[1],
             refresh_token=row[2],
-            expires_at=row[3] if row[3] and isinstance(row[3], datetime) else 
-                      (datetime.fromisoformat(str(row[3])) if row[3] else None),
+            expires_at=cls._parse_expires_at(row[3]),
             bot_username=row[4],
-            created_at=row[5] if isinstance(row[5], datetime) else datetime.fromisoformat(str(row[5]))
+            created_at=row[5] if row[5] is None or isinstance(row[5], datetime) else 
+                      datetime.fromisoformat(str(row[5]))
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MessageEvent:
     """Represents an incoming message event from IRC."""
     channel: str
@@ -160,6 +195,17 @@ class MessageEvent:
     is_mention: bool = False
     mention_content: str = ""
     
+    def as_row_tuple(self) -> tuple:
+        """
+        Get the values for a messages table insert.
+        
+        Returns:
+            Tuple of (message_id, channel, user_id, user_display_name,
+            message_content, timestamp)
+        """
+        return (self.message_id, self.channel, self.user_id,
+                self.user_display_name, self.content, self.timestamp)
+    
     def to_message(self) -> Message:
         """Convert to Message model for database storage."""
         return Message(
@@ -183,9 +229,10 @@ class MessageEvent:
         Returns:
             MessageEvent instance
         """
+        # Channel and user IDs recur on every message and key most lookups
         return cls(
-            channel=message.channel.name,
-            user_id=str(message.author.id) if message.author.id else "unknown",
+            channel=sys.intern(message.channel.name),
+            user_id=sys.intern(str(message.author.id)) if message.author.id else "unknown",
             user_display_name=message.author.display_name or message.author.name,
             message_id=message.id or f"msg_{datetime.now().timestamp()}",
             content=message.content,
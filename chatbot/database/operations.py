@@ -6,28 +6,158 @@ retrieval, and management with support for both SQLite and MySQL.
 """
 
 import sqlite3
-import mysql.connector
-from mysql.connector import pooling
 import asyncio
 import logging
-from typing import List, Optional, Dict, Any, Union
+import random
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Mapping, NamedTuple, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+from functools import partial
+from types import MappingProxyType
 import time
 
 from .models import Message, MessageEvent, ChannelConfig, UserResponseCooldown, BotMetric, AuthToken
-from .migrations import DatabaseMigrations
+from .migrations import DatabaseMigrations, SQLITE_CONNECTION_PRAGMAS
 from .resilience import ResilientDatabaseManager, ConnectionHealthMonitor
 
 logger = logging.getLogger(__name__)
 
 
+def _convert_datetime(value: bytes) -> Union[datetime, int]:
+    """
+    Convert a stored SQLite DATETIME value.
+    
+    Args:
+        value: Raw column bytes from SQLite
+        
+    Returns:
+        datetime, or int for values stored as Unix timestamps
+    """
+    text = value.decode()
+    if text.isdigit():
+        return int(text)
+    return datetime.fromisoformat(text)
+
+
+# Let the driver hand back datetime objects for DATETIME columns
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+# Levels accepted for PRAGMA synchronous, which cannot take a bound parameter
+_SQLITE_SYNCHRONOUS_LEVELS = frozenset(('OFF', 'NORMAL', 'FULL', 'EXTRA'))
+
+# UPDATE ... RETURNING needs SQLite 3.35+
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Channel config settings: (accepted exact types, minimum, maximum), None for no bound
+_SETTING_VALIDATORS: Mapping[str, Tuple[Tuple[type, ...], Optional[int], Optional[int]]] = MappingProxyType({
+    'message_threshold': ((int,), 1, 1000),
+    'spontaneous_cooldown': ((int,), 0, 3600),
+    'response_cooldown': ((int,), 0, 3600),
+    'context_limit': ((int,), 10, 1000),
+    'ollama_model': ((str, type(None)), None, None),
+    'message_count': ((int,), 0, None),
+})
+
+
+class _MessageQueries(NamedTuple):
+    """Dialect-specific SQL for the messages table."""
+    insert: str
+    select_recent: str
+    count_recent: str
+    count_recent_limited: str
+    delete_by_id: str
+    delete_by_user: str
+    delete_channel: str
+    delete_older: str
+
+
+_SQLITE_MESSAGE_QUERIES = _MessageQueries(
+    insert="""
+        INSERT OR IGNORE INTO messages 
+        (message_id, channel, user_id, user_display_name, message_content, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    select_recent="""
+        SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
+        FROM (
+            SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
+            FROM messages 
+            WHERE channel = ? 
+            ORDER BY timestamp DESC 
+            LIMIT ?
+        ) recent
+        ORDER BY timestamp, id
+    """,
+    count_recent="SELECT COUNT(*) FROM messages WHERE channel = ? AND timestamp > ?",
+    count_recent_limited="""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM messages WHERE channel = ? AND timestamp > ? LIMIT ?
+        )
+    """,
+    delete_by_id="DELETE FROM messages WHERE message_id = ?",
+    delete_by_user="DELETE FROM messages WHERE channel = ? AND user_id = ?",
+    delete_channel="DELETE FROM messages WHERE channel = ?",
+    delete_older="DELETE FROM messages WHERE channel = ? AND timestamp < ?",
+)
+
+_MYSQL_MESSAGE_QUERIES = _MessageQueries(
+    insert="""
+        INSERT IGNORE INTO messages 
+        (message_id, channel, user_id, user_display_name, message_content, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+    select_recent="""
+        SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
+        FROM (
+            SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
+            FROM messages 
+            WHERE channel = %s 
+            ORDER BY timestamp DESC 
+            LIMIT %s
+        ) recent
+        ORDER BY timestamp, id
+    """,
+    count_recent="SELECT COUNT(*) FROM messages WHERE channel = %s AND timestamp > %s",
+    count_recent_limited="""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM messages WHERE channel = %s AND timestamp > %s LIMIT %s
+        ) AS recent
+    """,
+    delete_by_id="DELETE FROM messages WHERE message_id = %s",
+    delete_by_user="DELETE FROM messages WHERE channel = %s AND user_id = %s",
+    delete_channel="DELETE FROM messages WHERE channel = %s",
+    delete_older="DELETE FROM messages WHERE channel = %s AND timestamp < %s",
+)
+
+# One fixed UPDATE per validated setting, so column names never come from callers
+_SQLITE_SETTING_UPDATES: Mapping[str, str] = MappingProxyType({
+    key: f"UPDATE channel_config SET {key} = ?, updated_at = CURRENT_TIMESTAMP WHERE channel = ?"
+    for key in _SETTING_VALIDATORS
+})
+
+_MYSQL_SETTING_UPDATES: Mapping[str, str] = MappingProxyType({
+    key: f"UPDATE channel_config SET {key} = %s, updated_at = CURRENT_TIMESTAMP WHERE channel = %s"
+    for key in _SETTING_VALIDATORS
+})
+
+
 # Function moved after DatabaseManager class definition
 
 
 class DatabaseManager:
     """Manages database connections and operations with factory pattern for SQLite/MySQL."""
     
+    # Seconds store_message waits to coalesce concurrent messages into one
+    # insert; 0 writes on the next event loop pass, so sequential callers
+    # pay no extra latency
+    MESSAGE_FLUSH_INTERVAL = 0.0
+    # Queued message count that triggers an immediate insert
+    MAX_MESSAGE_BATCH = 500
+    # Retries _with_retry makes after a transient OperationalError
+    MAX_RETRIES = 3
+    # Upper bound in seconds of the first retry's jittered delay; doubles per retry
+    RETRY_BASE_DELAY = 0.1
+    
     def __init__(self, db_type: str = "sqlite", **connection_params):
         """
         Initialize DatabaseManager with factory pattern.
@@ -35,18 +165,39 @@ class DatabaseManager:
         Args:
             db_type: Either 'sqlite' or 'mysql'
             **connection_params: Database connection parameters
+            
+        Raises:
+            ValueError: If the SQLite synchronous level is not OFF, NORMAL, FULL or EXTRA
         """
         self.db_type = db_type.lower()
         self.connection_params = connection_params
+        
+        synchronous = connection_params.get('synchronous')
+        if synchronous:
+            synchronous = str(synchronous).upper()
+            if synchronous not in _SQLITE_SYNCHRONOUS_LEVELS:
+                raise ValueError(f"Invalid SQLite synchronous level: {connection_params['synchronous']}")
+            connection_params['synchronous'] = synchronous
+        
+        # SQL for the messages table, picked once for this dialect
+        self._queries = _MYSQL_MESSAGE_QUERIES if self.db_type == 'mysql' else _SQLITE_MESSAGE_QUERIES
         self.connection_pool = None
-        self._retry_count = 0
-        self._max_retries = 5  # Increased from 3 for better resilience
-        self._retry_delay = 1.0  # Start with 1 second delay
+        # SQLite uses one long-lived connection, serialised by the lock
+        self._sqlite_conn: Optional[sqlite3.Connection] = None
+        self._sqlite_lock = asyncio.Lock()
+        # Messages waiting for the next batched insert, with their callers' futures
+        self._pending_messages: List[Tuple[MessageEvent, asyncio.Future]] = []
+        self._message_flush_task: Optional[asyncio.Task] = None
+        # Driver errors worth retrying; anything else is a bug or bad input
+        self._retryable_errors: Tuple[type, ...] = (sqlite3.OperationalError,)
+        if self.db_type == 'mysql':
+            import mysql.connector
+            self._retryable_errors += (mysql.connector.errors.OperationalError,)
         
         # Connection health monitoring
         self.health_monitor = ConnectionHealthMonitor(
-            max_retries=self._max_retries,
-            base_delay=self._retry_delay,
+            max_retries=5,
+            base_delay=1.0,
             max_delay=60.0
         )
         self._connection_healthy = True
@@ -72,6 +223,8 @@ class DatabaseManager:
             # Set up connection pool for MySQL
             if self.db_type == 'mysql':
                 await self._setup_mysql_pool()
+            elif self.db_type == 'sqlite' and self._sqlite_conn is None:
+                self._sqlite_conn = self._open_sqlite_connection()
             
             logger.info(f"Database manager initialized ({self.db_type})")
             return True
@@ -82,6 +235,9 @@ class DatabaseManager:
     
     async def _setup_mysql_pool(self):
         """Set up MySQL connection pool."""
+        # Imported here so SQLite deployments never load the MySQL driver
+        from mysql.connector import pooling
+        
         try:
             pool_config = {
                 'pool_name': 'chatbot_pool',
@@ -102,6 +258,24 @@ class DatabaseManager:
             logger.error(f"Failed to create MySQL connection pool: {e}")
             raise
     
+    def _open_sqlite_connection(self) -> sqlite3.Connection:
+        """Open and tune the shared SQLite connection."""
+        database_path = self.connection_params.get('database_url', './chatbot.db')
+        connection = sqlite3.connect(
+            database_path,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        for pragma in SQLITE_CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        
+        # Operators may trade durability for write speed (validated in __init__)
+        synchronous = self.connection_params.get('synchronous')
+        if synchronous:
+            connection.execute(f"PRAGMA synchronous={synchronous}")
+        return connection
+    
     @asynccontextmanager
     async def get_connection(self):
         """
@@ -113,106 +287,178 @@ class DatabaseManager:
         connection = None
         try:
             if self.db_type == 'sqlite':
-                database_path = self.connection_params.get('database_url', './chatbot.db')
-                connection = sqlite3.connect(database_path)
-                connection.row_factory = sqlite3.Row
-                yield connection
+                async with self._sqlite_lock:
+                    if self._sqlite_conn is None:
+                        self._sqlite_conn = self._open_sqlite_connection()
+                    try:
+                        yield self._sqlite_conn
+                    finally:
+                        # Discard uncommitted work, as closing the connection used to
+                        if self._sqlite_conn.in_transaction:
+                            self._sqlite_conn.rollback()
                 
             elif self.db_type == 'mysql':
+                # Checkout, connect and release (which resets the pooled
+                # session) all wait on the server, so keep them off the loop
+                loop = asyncio.get_running_loop()
                 if self.connection_pool:
-                    connection = self.connection_pool.get_connection()
+                    connection = await loop.run_in_executor(None, self.connection_pool.get_connection)
                 else:
-                    connection = mysql.connector.connect(
+                    import mysql.connector
+                    connection = await loop.run_in_executor(None, partial(
+                        mysql.connector.connect,
                         host=self.connection_params['host'],
                         port=self.connection_params.get('port', 3306),
                         user=self.connection_params['user'],
                         password=self.connection_params['password'],
                         database=self.connection_params['database']
-                    )
+                    ))
                 yield connection
                 
         except Exception as e:
             logger.error(f"Database connection error: {e}")
-            await self._handle_connection_error(e)
             raise
         finally:
             if connection:
                 try:
-                    connection.close()
+                    await asyncio.get_running_loop().run_in_executor(None, connection.close)
                 except:
                     pass
     
-    async def _handle_connection_error(self, error: Exception):
-        """Handle connection errors with exponential backoff retry."""
-        self._retry_count += 1
+    async def close(self):
+        """Write any queued messages and close the shared SQLite connection."""
+        if self._message_flush_task and not self._message_flush_task.done():
+            self._message_flush_task.cancel()
+            try:
+                await self._message_flush_task
+            except asyncio.CancelledError:
+                pass
+        self._message_flush_task = None
+        await self._flush_messages()
         
-        if self._retry_count <= self._max_retries:
-            # Enhanced exponential backoff with jitter and maximum delay cap
-            base_delay = self._retry_delay * (2 ** (self._retry_count - 1))
-            max_delay = 60.0  # Cap at 60 seconds
-            delay = min(base_delay, max_delay)
-            
-            # Add jitter (±20%) to prevent thundering herd
-            import random
-            jitter = delay * 0.2 * (random.random() - 0.5)
-            delay = max(0, delay + jitter)
+        async with self._sqlite_lock:
+            if self._sqlite_conn is not None:
+                self._sqlite_conn.close()
+                self._sqlite_conn = None
+    
+    async def _with_retry(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a database operation, retrying it on transient driver errors.
+        
+        Each call keeps its own attempt count. Delays are drawn uniformly
+        from a window that doubles per attempt, so callers waiting on a
+        recovering server do not all retry at once.
+        
+        Args:
+            operation: Zero-argument callable returning a fresh awaitable per attempt
             
-            logger.warning(f"Database connection failed, retrying in {delay:.2f}s (attempt {self._retry_count}/{self._max_retries}): {error}")
-            await asyncio.sleep(delay)
-        else:
-            logger.error(f"Database connection failed after {self._max_retries} attempts: {error}")
-            self._retry_count = 0  # Reset for next operation
+        Returns:
+            The operation's result
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return await operation()
+            except self._retryable_errors as e:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                delay = random.uniform(0, self.RETRY_BASE_DELAY * 2 ** attempt)
+                logger.warning(f"Database operation failed, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.MAX_RETRIES}): {e}")
+                await asyncio.sleep(delay)
     
     async def store_message(self, message_event: MessageEvent) -> bool:
         """
         Store a message in the database.
         
+        Messages stored concurrently (within MESSAGE_FLUSH_INTERVAL) are
+        written together in one insert and transaction.
+        
         Args:
             message_event: MessageEvent to store
             
         Returns:
             bool: True if successful, False otherwise
         """
+        future = asyncio.get_running_loop().create_future()
+        self._pending_messages.append((message_event, future))
+        
+        if len(self._pending_messages) >= self.MAX_MESSAGE_BATCH:
+            await self._flush_messages()
+        elif self._message_flush_task is None or self._message_flush_task.done():
+            self._message_flush_task = asyncio.create_task(self._flush_messages_later())
+        
+        return await future
+    
+    async def _flush_messages_later(self):
+        """
+        Write queued messages once the flush interval has passed.
+        
+        store_message only starts this task when it is not running, so it
+        keeps flushing until no message queued during a write is left.
+        """
+        while self._pending_messages:
+            await asyncio.sleep(self.MESSAGE_FLUSH_INTERVAL)
+            await self._flush_messages()
+    
+    async def _flush_messages(self):
+        """Write all queued messages and report the result to their callers."""
+        if not self._pending_messages:
+            return
+        
+        batch, self._pending_messages = self._pending_messages, []
+        result = False
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO messages 
-                        (message_id, channel, user_id, user_display_name, message_content, timestamp)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        message_event.message_id,
-                        message_event.channel,
-                        message_event.user_id,
-                        message_event.user_display_name,
-                        message_event.content,
-                        message_event.timestamp
-                    ))
-                    conn.commit()
-                    
-                elif self.db_type == 'mysql':
-                    cursor.execute("""
-                        INSERT IGNORE INTO messages 
-                        (message_id, channel, user_id, user_display_name, message_content, timestamp)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (
-                        message_event.message_id,
-                        message_event.channel,
-                        message_event.user_id,
-                        message_event.user_display_name,
-                        message_event.content,
-                        message_event.timestamp
-                    ))
-                
-                self._retry_count = 0  # Reset retry count on success
-                return True
+            result = await self.store_messages(event for event, _ in batch)
+        finally:
+            # Callers are always answered, even if the flush is cancelled
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(result)
+    
+    async def store_messages(self, message_events: Iterable[MessageEvent]) -> bool:
+        """
+        Store several messages with one batched insert and commit.
+        
+        Messages whose message_id is already stored are skipped.
+        
+        Args:
+            message_events: MessageEvents to store
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        rows = [event.as_row_tuple() for event in message_events]
+        if not rows:
+            return True
+        
+        try:
+            await self._with_retry(partial(self._write_many, self._queries.insert, rows))
+            return True
                 
         except Exception as e:
-            logger.error(f"Failed to store message: {e}")
+            logger.error(f"Failed to store {len(rows)} message(s): {e}")
             return False
     
+    async def _read(self, query: str, params: tuple) -> List[tuple]:
+        """Run one query and return all of its rows."""
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    async def _write(self, query: str, params: tuple):
+        """Run one statement in its own transaction."""
+        async with self.get_connection() as conn:
+            conn.cursor().execute(query, params)
+            if self.db_type == 'sqlite':
+                conn.commit()
+    
+    async def _write_many(self, query: str, rows: List[tuple]):
+        """Run one statement for every row in a single transaction."""
+        async with self.get_connection() as conn:
+            conn.cursor().executemany(query, rows)
+            if self.db_type == 'sqlite':
+                conn.commit()
+    
     async def get_recent_messages(self, channel: str, limit: int = 200) -> List[Message]:
         """
         Retrieve recent messages for a channel.
@@ -225,32 +471,9 @@ class DatabaseManager:
             List of Message objects
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("""
-                        SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
-                        FROM messages 
-                        WHERE channel = ? 
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                    """, (channel, limit))
-                    
-                elif self.db_type == 'mysql':
-                    cursor.execute("""
-                        SELECT id, message_id, channel, user_id, user_display_name, message_content, timestamp
-                        FROM messages 
-                        WHERE channel = %s 
-                        ORDER BY timestamp DESC 
-                        LIMIT %s
-                    """, (channel, limit))
-                
-                rows = cursor.fetchall()
-                messages = [Message.from_db_row(row) for row in rows]
-                
-                # Return in chronological order (oldest first)
-                return list(reversed(messages))
+            rows = await self._with_retry(partial(self._read, self._queries.select_recent, (channel, limit)))
+            # Rows arrive in chronological order (oldest first)
+            return Message.from_db_rows(rows)
                 
         except Exception as e:
             logger.error(f"Failed to retrieve messages for {channel}: {e}")
@@ -267,16 +490,8 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("DELETE FROM messages WHERE message_id = ?", (message_id,))
-                    conn.commit()
-                elif self.db_type == 'mysql':
-                    cursor.execute("DELETE FROM messages WHERE message_id = %s", (message_id,))
-                
-                return True
+            await self._with_retry(partial(self._write, self._queries.delete_by_id, (message_id,)))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to delete message {message_id}: {e}")
@@ -294,16 +509,8 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("DELETE FROM messages WHERE channel = ? AND user_id = ?", (channel, user_id))
-                    conn.commit()
-                elif self.db_type == 'mysql':
-                    cursor.execute("DELETE FROM messages WHERE channel = %s AND user_id = %s", (channel, user_id))
-                
-                return True
+            await self._with_retry(partial(self._write, self._queries.delete_by_user, (channel, user_id)))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to delete messages for user {user_id} in {channel}: {e}")
@@ -320,16 +527,8 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("DELETE FROM messages WHERE channel = ?", (channel,))
-                    conn.commit()
-                elif self.db_type == 'mysql':
-                    cursor.execute("DELETE FROM messages WHERE channel = %s", (channel,))
-                
-                return True
+            await self._with_retry(partial(self._write, self._queries.delete_channel, (channel,)))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to clear messages in {channel}: {e}")
@@ -349,45 +548,35 @@ class DatabaseManager:
         try:
             cutoff_date = datetime.now() - timedelta(days=retention_days)
             
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("DELETE FROM messages WHERE channel = ? AND timestamp < ?", (channel, cutoff_date))
-                    conn.commit()
-                elif self.db_type == 'mysql':
-                    cursor.execute("DELETE FROM messages WHERE channel = %s AND timestamp < %s", (channel, cutoff_date))
-                
-                return True
+            await self._with_retry(partial(self._write, self._queries.delete_older, (channel, cutoff_date)))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to cleanup old messages in {channel}: {e}")
             return False
     
-    async def count_recent_messages(self, channel: str, hours: int = 24) -> int:
+    async def count_recent_messages(self, channel: str, hours: int = 24, limit: Optional[int] = None) -> int:
         """
         Count recent messages in a channel.
         
         Args:
             channel: Channel name
             hours: Number of hours to look back
+            limit: Stop counting once this many messages are found
             
         Returns:
-            int: Number of messages
+            int: Number of messages (at most limit, when given)
         """
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
             
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if self.db_type == 'sqlite':
-                    cursor.execute("SELECT COUNT(*) FROM messages WHERE channel = ? AND timestamp > ?", (channel, cutoff_time))
-                elif self.db_type == 'mysql':
-                    cursor.execute("SELECT COUNT(*) FROM messages WHERE channel = %s AND timestamp > %s", (channel, cutoff_time))
-                
-                result = cursor.fetchone()
-                return result[0] if result else 0
+            if limit is None:
+                read = partial(self._read, self._queries.count_recent, (channel, cutoff_time))
+            else:
+                read = partial(self._read, self._queries.count_recent_limited, (channel, cutoff_time, limit))
+            
+            rows = await self._with_retry(read)
+            return rows[0][0] if rows else 0
                 
         except Exception as e:
             logger.error(f"Failed to count messages in {channel}: {e}")
@@ -430,19 +619,41 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.executemany(query, params_list)
-                
-                if self.db_type == 'sqlite':
-                    conn.commit()
-                
-                return True
+            await self._with_retry(partial(self._write_many, query, params_list))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to execute batch query: {e}")
             return False
     
+    async def fetch_iter(self, query: str, params: tuple = (),
+                         batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over query results, fetching rows from the driver in batches.
+        
+        The connection is held until iteration finishes, so do not run other
+        queries from inside the loop.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            batch_size: Number of rows fetched from the driver at a time
+            
+        Yields:
+            Result rows as dictionaries
+        """
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+    
     async def fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
         Fetch all results from a query.
@@ -455,24 +666,16 @@ class DatabaseManager:
             List of result dictionaries
         """
         try:
-            async with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                
-                # Get column names
-                if self.db_type == 'sqlite':
-                    columns = [description[0] for description in cursor.description]
-                    rows = cursor.fetchall()
-                    return [dict(zip(columns, row)) for row in rows]
-                elif self.db_type == 'mysql':
-                    columns = [description[0] for description in cursor.description]
-                    rows = cursor.fetchall()
-                    return [dict(zip(columns, row)) for row in rows]
+            return await self._with_retry(partial(self._fetch_list, query, params))
                 
         except Exception as e:
             logger.error(f"Failed to fetch query results: {e}")
             return []
     
+    async def _fetch_list(self, query: str, params: tuple) -> List[Dict[str, Any]]:
+        """Collect every row of a query into a list."""
+        return [row async for row in self.fetch_iter(query, params)]
+    
     async def health_check(self) -> bool:
         """
         Perform a health check on the database connection.
@@ -530,8 +733,7 @@ class DatabaseManager:
             'connection_healthy': self._connection_healthy,
             'last_health_check': self._last_health_check.isoformat(),
             'health_check_interval': self._health_check_interval,
-            'retry_count': self._retry_count,
-            'max_retries': self._max_retries,
+            'max_retries': self.MAX_RETRIES,
         }
         
         # Add health monitor status
@@ -629,7 +831,8 @@ def create_database_manager(config: Dict[str, str], enable_resilience: bool = Tr
     else:  # Default to SQLite
         base_manager = DatabaseManager(
             db_type='sqlite',
-            database_url=config.get('DATABASE_URL', './chatbot.db')
+            database_url=config.get('DATABASE_URL', './chatbot.db'),
+            synchronous=config.get('DATABASE_SYNCHRONOUS', 'NORMAL')
         )
     
     # Wrap with resilience features if enabled
@@ -642,6 +845,11 @@ def create_database_manager(config: Dict[str, str], enable_resilience: bool = Tr
 class ChannelConfigManager:
     """Manages per-channel configuration with database persistence."""
     
+    # Seconds a loaded configuration is served from cache before re-reading
+    CONFIG_CACHE_TTL = 60.0
+    # Seconds the fallback configuration is served after a failed load
+    CONFIG_ERROR_TTL = 5.0
+    
     def __init__(self, db_manager: DatabaseManager):
         """
         Initialize ChannelConfigManager.
@@ -650,7 +858,12 @@ class ChannelConfigManager:
             db_manager: DatabaseManager instance
         """
         self.db_manager = db_manager
+        # UPDATE statements for this dialect, keyed by setting name
+        self._setting_updates = _MYSQL_SETTING_UPDATES if db_manager.db_type == 'mysql' else _SQLITE_SETTING_UPDATES
+        # Updates write through to the cached objects in place
         self._config_cache: Dict[str, ChannelConfig] = {}
+        # time.monotonic() deadline after which a cached config is reloaded
+        self._config_expires: Dict[str, float] = {}
     
     async def get_config(self, channel: str) -> ChannelConfig:
         """
@@ -663,8 +876,9 @@ class ChannelConfigManager:
             ChannelConfig object
         """
         # Check cache first
-        if channel in self._config_cache:
-            return self._config_cache[channel]
+        config = self._config_cache.get(channel)
+        if config is not None and time.monotonic() < self._config_expires[channel]:
+            return config
         
         try:
             async with self.db_manager.get_connection() as conn:
@@ -676,22 +890,28 @@ class ChannelConfigManager:
                     cursor.execute("SELECT * FROM channel_config WHERE channel = %s", (channel,))
                 
                 row = cursor.fetchone()
-                
-                if row:
-                    config = ChannelConfig.from_db_row(row)
-                else:
-                    # Create default configuration
-                    config = ChannelConfig(channel=channel)
-                    await self._create_default_config(config)
-                
-                # Cache the configuration
-                self._config_cache[channel] = config
-                return config
+            
+            # Created outside the block above, which holds the connection
+            if row:
+                config = ChannelConfig.from_db_row(row)
+            else:
+                # Create default configuration
+                config = ChannelConfig(channel=channel)
+                await self._create_default_config(config)
+            
+            # Cache the configuration
+            self._config_cache[channel] = config
+            self._config_expires[channel] = time.monotonic() + self.CONFIG_CACHE_TTL
+            return config
                 
         except Exception as e:
             logger.error(f"Failed to get config for {channel}: {e}")
-            # Return default config on error
-            return ChannelConfig(channel=channel)
+            # Return default config on error, briefly cached so repeated
+            # lookups don't retry a failing database on every message
+            config = ChannelConfig(channel=channel)
+            self._config_cache[channel] = config
+            self._config_expires[channel] = time.monotonic() + self.CONFIG_ERROR_TTL
+            return config
     
     async def _create_default_config(self, config: ChannelConfig) -> bool:
         """Create default configuration in database."""
@@ -754,21 +974,9 @@ class ChannelConfigManager:
             
             async with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
-                
+                cursor.execute(self._setting_updates[key], (value, channel))
                 if self.db_manager.db_type == 'sqlite':
-                    cursor.execute(f"""
-                        UPDATE channel_config 
-                        SET {key} = ?, updated_at = CURRENT_TIMESTAMP 
-                        WHERE channel = ?
-                    """, (value, channel))
                     conn.commit()
-                    
-                elif self.db_manager.db_type == 'mysql':
-                    cursor.execute(f"""
-                        UPDATE channel_config 
-                        SET {key} = %s, updated_at = CURRENT_TIMESTAMP 
-                        WHERE channel = %s
-                    """, (value, channel))
                 
                 # Update cache
                 if channel in self._config_cache:
@@ -783,17 +991,14 @@ class ChannelConfigManager:
     
     def _validate_setting(self, key: str, value: Any) -> bool:
         """Validate configuration setting value."""
-        validators = {
-            'message_threshold': lambda v: isinstance(v, int) and 1 <= v <= 1000,
-            'spontaneous_cooldown': lambda v: isinstance(v, int) and 0 <= v <= 3600,
-            'response_cooldown': lambda v: isinstance(v, int) and 0 <= v <= 3600,
-            'context_limit': lambda v: isinstance(v, int) and 10 <= v <= 1000,
-            'ollama_model': lambda v: isinstance(v, (str, type(None))),
-            'message_count': lambda v: isinstance(v, int) and v >= 0
-        }
+        spec = _SETTING_VALIDATORS.get(key)
+        if spec is None:
+            return False
         
-        validator = validators.get(key)
-        return validator(value) if validator else False
+        types, minimum, maximum = spec
+        if type(value) not in types:
+            return False
+        return (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
     
     async def increment_message_count(self, channel: str) -> int:
         """
@@ -810,28 +1015,39 @@ class ChannelConfigManager:
                 cursor = conn.cursor()
                 
                 if self.db_manager.db_type == 'sqlite':
-                    cursor.execute("""
-                        UPDATE channel_config 
-                        SET message_count = message_count + 1 
-                        WHERE channel = ?
-                    """, (channel,))
-                    conn.commit()
-                    
-                    # Get the new count
-                    cursor.execute("SELECT message_count FROM channel_config WHERE channel = ?", (channel,))
+                    if _SQLITE_HAS_RETURNING:
+                        cursor.execute("""
+                            UPDATE channel_config 
+                            SET message_count = message_count + 1 
+                            WHERE channel = ?
+                            RETURNING message_count
+                        """, (channel,))
+                        # Drain the statement so it is finished before commit
+                        rows = cursor.fetchall()
+                        result = rows[0] if rows else None
+                        conn.commit()
+                    else:
+                        cursor.execute("""
+                            UPDATE channel_config 
+                            SET message_count = message_count + 1 
+                            WHERE channel = ?
+                        """, (channel,))
+                        conn.commit()
+                        
+                        # Get the new count
+                        cursor.execute("SELECT message_count FROM channel_config WHERE channel = ?", (channel,))
+                        result = cursor.fetchone()
+                    new_count = result[0] if result else 0
                     
                 elif self.db_manager.db_type == 'mysql':
+                    # LAST_INSERT_ID(expr) hands the new count back with the
+                    # UPDATE's OK packet, as MySQL has no RETURNING
                     cursor.execute("""
                         UPDATE channel_config 
-                        SET message_count = message_count + 1 
+                        SET message_count = LAST_INSERT_ID(message_count + 1) 
                         WHERE channel = %s
                     """, (channel,))
-                    
-                    # Get the new count
-                    cursor.execute("SELECT message_count FROM channel_config WHERE channel = %s", (channel,))
-                
-                result = cursor.fetchone()
-                new_count = result[0] if result else 0
+                    new_count = cursor.lastrowid if cursor.rowcount else 0
                 
                 # Update cache
                 if channel in self._config_cache:
@@ -931,13 +1147,13 @@ class ChannelConfigManager:
                 return False
             
             # Check spontaneous cooldown
-            if config.last_spontaneous_message:
-                time_since = datetime.now() - config.last_spontaneous_message
-                if time_since.total_seconds() < config.spontaneous_cooldown:
+            if config.last_spontaneous_ts is not None:
+                if time.time() - config.last_spontaneous_ts < config.spontaneous_cooldown:
                     return False
             
-            # Check adequate context
-            available_messages = await self.db_manager.count_recent_messages(channel)
+            # Check adequate context; only whether 10 exist matters, so the
+            # count stops there instead of scanning the whole day
+            available_messages = await self.db_manager.count_recent_messages(channel, limit=10)
             if available_messages < 10:
                 return False
             
@@ -1280,6 +1496,35 @@ class AuthTokenManager:
             logger.error(f"Failed to retrieve auth tokens: {e}")
             return None
     
+    async def get_auth_tokens_minimal(self) -> Optional[AuthToken]:
+        """
+        Retrieve stored authentication tokens without bookkeeping columns.
+        
+        Only the columns needed to use and refresh the token are selected;
+        created_at is left as None on the returned object.
+        
+        Returns:
+            Optional[AuthToken]: AuthToken object or None if not found
+        """
+        try:
+            async with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, access_token, refresh_token, expires_at, bot_username
+                    FROM auth_tokens 
+                    ORDER BY created_at DESC 
+                    LIMIT 1
+                """)
+                
+                row = cursor.fetchone()
+                if row:
+                    return AuthToken.from_db_row(tuple(row) + (None,))
+                return None
+                
+        except Exception as e:
+            logger.error(f"Failed to retrieve auth tokens: {e}")
+            return None
+    
     async def update_auth_tokens(self, auth_token: AuthToken) -> bool:
         """
         Update existing authentication tokens.
@@ -1492,7 +1737,8 @@ class MetricsManager:
             hours: Number of hours to look back
             
         Returns:
-            Dict with performance statistics
+            Dict with 'metrics' and 'errors', each mapping metric type to
+            statistics; error_* metrics are only listed under 'errors'
         """
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
@@ -1516,22 +1762,25 @@ class MetricsManager:
                     """, (channel, cutoff_time))
                 
                 rows = cursor.fetchall()
-                stats = {}
+                metrics = {}
+                errors = {}
                 
                 for row in rows:
                     metric_type, avg_value, count, max_value, min_value = row
-                    stats[metric_type] = {
+                    # Error metrics are grouped so callers need not scan every key
+                    group = errors if metric_type.startswith('error_') else metrics
+                    group[metric_type] = {
                         'average': float(avg_value),
                         'count': int(count),
                         'maximum': float(max_value),
                         'minimum': float(min_value)
                     }
                 
-                return stats
+                return {'metrics': metrics, 'errors': errors}
                 
         except Exception as e:
             logger.error(f"Failed to get performance stats for {channel}: {e}")
-            return {}
+            return {'metrics': {}, 'errors': {}}
     
     async def cleanup_old_metrics(self, retention_days: int = 7) -> bool:
         """
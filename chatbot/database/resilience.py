@@ -369,6 +369,17 @@ class ResilientDatabaseManager:
         )
         return result is not None and result
     
+    async def store_messages(self, message_events) -> bool:
+        """Store several messages in one batch with resilience."""
+        # Materialise once so a retried attempt sees the same messages
+        message_events = list(message_events)
+        result = await self.execute_with_resilience(
+            lambda: self.base_manager.store_messages(message_events),
+            operation_type="write",
+            allow_partial_failure=False
+        )
+        return result is not None and result
+    
     async def get_recent_messages(self, channel: str, limit: int = 200):
         """Get recent messages with resilience."""
         result = await self.execute_with_resilience(
@@ -414,10 +425,11 @@ class ResilientDatabaseManager:
         )
         return result is not None and result
     
-    async def count_recent_messages(self, channel: str, hours: int = 24) -> int:
-        """Count recent messages with resilience."""
+    async def count_recent_messages(self, channel: str, hours: int = 24,
+                                    limit: Optional[int] = None) -> int:
+        """Count recent messages, optionally stopping at limit, with resilience."""
         result = await self.execute_with_resilience(
-            lambda: self.base_manager.count_recent_messages(channel, hours),
+            lambda: self.base_manager.count_recent_messages(channel, hours, limit),
             operation_type="read",
             allow_partial_failure=True
         )
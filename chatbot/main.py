@@ -12,7 +12,7 @@ import sys
 import os
 from typing import Optional
 
-from chatbot.config.settings import GlobalConfig, load_global_config, validate_config, ConfigurationSystem
+from chatbot.config.settings import GlobalConfig, load_global_config, ConfigurationSystem
 from chatbot.database import create_database_manager, AuthTokenManager, ChannelConfigManager
 from chatbot.auth import AuthenticationManager, validate_startup_authentication
 from chatbot.irc.client import TwitchIRCClient
@@ -107,9 +107,8 @@ class ChatbotApplication:
             raise
     
     async def _initialize_configuration(self) -> None:
-        """Load and validate global configuration."""
+        """Load global configuration (validated on construction)."""
         self.config = load_global_config()
-        validate_config(self.config)
         self._initialized_components.append("configuration")
     
     async def _initialize_logging(self) -> None:
@@ -135,6 +134,7 @@ class ChatbotApplication:
         config_dict = {
             'DATABASE_TYPE': self.config.database_type,
             'DATABASE_URL': self.config.database_url,
+            'DATABASE_SYNCHRONOUS': self.config.database_synchronous,
             'MYSQL_HOST': self.config.mysql_host,
             'MYSQL_PORT': str(self.config.mysql_port),
             'MYSQL_USER': self.config.mysql_user,
@@ -234,7 +234,7 @@ class ChatbotApplication:
         self.logger.info("Initializing IRC client...")
         
         # Get bot username from authentication
-        bot_username = await self.auth_manager.get_bot_username()
+        bot_username = self.auth_manager.get_bot_username()
         if not bot_username:
             raise RuntimeError("Could not determine bot username from authentication")
         
@@ -458,9 +458,9 @@ class ChatbotApplication:
         """Shutdown authentication manager."""
         try:
             if self.auth_manager:
-                await self.auth_manager.close()
+                await self.auth_manager.shutdown()
                 if self.logger:
-                    self.logger.info("Authentication manager closed")
+                    self.logger.info("Authentication manager shut down")
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error closing authentication manager: {e}")
@@ -493,7 +493,7 @@ class ChatbotApplication:
                     elif component == "resource_manager" and self.resource_manager:
                         await self.resource_manager.shutdown()
                     elif component == "authentication" and self.auth_manager:
-                        await self.auth_manager.close()
+                        await self.auth_manager.shutdown()
                     elif component == "database" and self.db_manager:
                         await self.db_manager.close()
                     # Other components don't need explicit cleanup
@@ -0,0 +1,189 @@
+"""
+Unit tests for authentication management.
+
+Tests token lifecycle handling and startup authentication validation.
+"""
+
+import pytest
+import asyncio
+import base64
+from unittest.mock import Mock, AsyncMock
+
+import aiohttp
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+
+from chatbot.auth.manager import AuthenticationManager
+from chatbot.auth.startup import StartupAuthValidator, AuthErrorCategory
+from chatbot.auth.tokens import TokenManager
+
+
+def create_auth_manager(expires_in: int = 7200, bot_username: str = "testbot") -> AuthenticationManager:
+    """Create an AuthenticationManager with one stored, Twitch-valid token."""
+    auth_token_manager = Mock()
+    manager = AuthenticationManager("client_id", "client_secret", auth_token_manager,
+                                    encryption_key=Fernet.generate_key())
+    
+    stored_token = manager.token_manager.create_auth_token(
+        "access_token", "refresh_token", expires_in=expires_in, bot_username=bot_username
+    )
+    auth_token_manager.get_auth_tokens_minimal = AsyncMock(return_value=stored_token)
+    manager.oauth_client.validate_token = AsyncMock(return_value=(True, {'login': 'testbot'}))
+    return manager
+
+
+class TestAuthenticationManager:
+    """Test cases for AuthenticationManager class."""
+    
+    @pytest.mark.asyncio
+    async def test_auto_refresh_survives_startup_validation(self):
+        """Test that startup validation leaves proactive refresh running."""
+        manager = create_auth_manager()
+        
+        result = await StartupAuthValidator(manager).perform_startup_validation()
+        
+        assert result is True
+        task = manager._refresher_task
+        assert task is not None
+        assert not task.done()
+        
+        await manager.shutdown()
+        await asyncio.sleep(0)
+        assert manager._refresher_task is None
+        assert task.cancelled()
+    
+    @pytest.mark.asyncio
+    async def test_refreshed_token_trusted_only_briefly(self):
+        """Test that a refreshed token skips Twitch validation only right after the refresh."""
+        manager = create_auth_manager()
+        stored_token = await manager.auth_token_manager.get_auth_tokens_minimal()
+        manager._set_current_token(stored_token, "access_token", issued_by_refresh=True)
+        
+        assert await manager.validate_authentication() is True
+        manager.oauth_client.validate_token.assert_not_called()
+        
+        manager._refreshed_at_monotonic -= manager.RECENT_REFRESH_SECONDS + 1
+        assert await manager.validate_authentication() is True
+        manager.oauth_client.validate_token.assert_awaited_once_with("access_token")
+        
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_is_capped(self, monkeypatch):
+        """Test that a long server advertised Retry-After is capped at the backoff limit."""
+        manager = create_auth_manager()
+        manager.oauth_client.refresh_token = AsyncMock(side_effect=[
+            (None, 3600),
+            ({'access_token': 'new_token'}, None)
+        ])
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        
+        assert await manager._refresh_with_retry("refresh_token") == {'access_token': 'new_token'}
+        sleep.assert_awaited_once_with(manager._max_retry_delay)
+
+
+class TestStartupAuthValidator:
+    """Test cases for StartupAuthValidator error categories."""
+    
+    @pytest.mark.asyncio
+    async def test_no_stored_token(self):
+        """Test that missing tokens are reported as NO_TOKEN."""
+        manager = create_auth_manager()
+        manager.auth_token_manager.get_auth_tokens_minimal = AsyncMock(return_value=None)
+        
+        success, _, category = await StartupAuthValidator(manager).validate_startup_authentication()
+        
+        assert success is False
+        assert category is AuthErrorCategory.NO_TOKEN
+    
+    @pytest.mark.asyncio
+    async def test_rejected_token(self):
+        """Test that a token Twitch rejects is reported as EXPIRED."""
+        # Close enough to expiry that startup asks Twitch again
+        manager = create_auth_manager(expires_in=400)
+        manager.oauth_client.validate_token = AsyncMock(side_effect=[
+            (True, {'login': 'testbot'}),
+            (False, None)
+        ])
+        
+        success, _, category = await StartupAuthValidator(manager).validate_startup_authentication()
+        
+        assert success is False
+        assert category is AuthErrorCategory.EXPIRED
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_network_error(self):
+        """Test that an unreachable Twitch is reported as NETWORK without refreshing."""
+        manager = create_auth_manager()
+        # Use the real validate_token against a session that cannot connect
+        del manager.oauth_client.validate_token
+        session = Mock()
+        session.get = Mock(side_effect=aiohttp.ClientConnectionError("unreachable"))
+        manager.oauth_client._get_session = Mock(return_value=session)
+        manager.oauth_client.refresh_token = AsyncMock()
+        
+        success, _, category = await StartupAuthValidator(manager).validate_startup_authentication()
+        
+        assert success is False
+        assert category is AuthErrorCategory.NETWORK
+        manager.oauth_client.refresh_token.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_unknown_error(self):
+        """Test that a token without a bot username is reported as UNKNOWN."""
+        manager = create_auth_manager(bot_username=None)
+        
+        success, _, category = await StartupAuthValidator(manager).validate_startup_authentication()
+        
+        assert success is False
+        assert category is AuthErrorCategory.UNKNOWN
+        await manager.shutdown()
+
+
+class TestTokenManager:
+    """Test cases for TokenManager encryption."""
+    
+    def test_encrypt_decrypt_round_trip(self):
+        """Test that encrypted tokens use the v2 format and decrypt back."""
+        manager = TokenManager(Fernet.generate_key())
+        
+        encrypted = manager.encrypt_token("secret_token")
+        
+        assert encrypted.startswith("v2:")
+        assert "secret_token" not in encrypted
+        assert encrypted != manager.encrypt_token("secret_token")  # Fresh nonce per call
+        assert TokenManager(manager.encryption_key).decrypt_token(encrypted) == "secret_token"
+    
+    def test_decrypt_legacy_fernet_tokens(self):
+        """Test that tokens written in the legacy Fernet formats still decrypt."""
+        key = Fernet.generate_key()
+        fernet_token = Fernet(key).encrypt(b"legacy_token")
+        manager = TokenManager(key)
+        
+        assert manager.decrypt_token(fernet_token.decode()) == "legacy_token"
+        assert manager.decrypt_token(base64.b64encode(fernet_token).decode()) == "legacy_token"
+    
+    def test_decrypt_rejects_tampered_token(self):
+        """Test that modified ciphertext fails authentication."""
+        manager = TokenManager(Fernet.generate_key())
+        data = bytearray(base64.b64decode(manager.encrypt_token("secret_token")[3:]))
+        data[-1] ^= 1
+        
+        with pytest.raises(InvalidTag):
+            manager.decrypt_token("v2:" + base64.b64encode(bytes(data)).decode())
+    
+    def test_decrypt_rejects_other_key(self):
+        """Test that a token encrypted under another key cannot be decrypted."""
+        encrypted = TokenManager(Fernet.generate_key()).encrypt_token("secret_token")
+        
+        with pytest.raises(InvalidTag):
+            TokenManager(Fernet.generate_key()).decrypt_token(encrypted)
+    
+    def test_invalid_key_length(self):
+        """Test that keys which do not decode to 32 bytes are rejected."""
+        with pytest.raises(ValueError):
+            TokenManager(base64.urlsafe_b64encode(b"x" * 16))
+        with pytest.raises(ValueError):
+            TokenManager("not a key")
@@ -119,9 +119,6 @@ class TestConfigurationManager:
                 mock_get.return_value = mock_config
                 mock_update.return_value = True
                 
-                # Mock successful model validation
-                configuration_manager.ollama_client.validate_model.return_value = True
-                
                 response = await configuration_manager.process_chat_command(
                     "testchannel", "TestMod", "!clank model llama3.1", moderator_badges
                 )
@@ -133,7 +130,6 @@ class TestConfigurationManager:
     async def test_process_chat_command_model_setting_invalid(self, configuration_manager, moderator_badges):
         """Test setting invalid model configuration."""
         # Mock model validation failure
-        configuration_manager.ollama_client.validate_model.return_value = False
         configuration_manager.ollama_client.list_available_models.return_value = ["llama3.1", "codellama"]
         
         response = await configuration_manager.process_chat_command(
@@ -312,17 +308,15 @@ class TestConfigurationManager:
     @pytest.mark.asyncio
     async def test_validate_model_change_success(self, configuration_manager):
         """Test successful model validation."""
-        configuration_manager.ollama_client.validate_model.return_value = True
-        
         is_valid, message = await configuration_manager.validate_model_change("llama3.1")
         
         assert is_valid is True
         assert "available" in message
+        configuration_manager.ollama_client.list_available_models.assert_awaited_once()
     
     @pytest.mark.asyncio
     async def test_validate_model_change_not_found(self, configuration_manager):
         """Test model validation when model not found."""
-        configuration_manager.ollama_client.validate_model.return_value = False
         configuration_manager.ollama_client.list_available_models.return_value = ["llama3.1", "codellama"]
         
         is_valid, message = await configuration_manager.validate_model_change("nonexistent")
@@ -342,7 +336,7 @@ class TestConfigurationManager:
     @pytest.mark.asyncio
     async def test_validate_model_change_validation_error(self, configuration_manager):
         """Test model validation when validation fails."""
-        configuration_manager.ollama_client.validate_model.side_effect = Exception("Connection error")
+        configuration_manager.ollama_client.list_available_models.side_effect = Exception("Connection error")
         
         is_valid, message = await configuration_manager.validate_model_change("llama3.1")
         
@@ -350,6 +344,16 @@ class TestConfigurationManager:
         assert is_valid is True
         assert "validation unavailable" in message
     
+    @pytest.mark.asyncio
+    async def test_validate_model_change_reuses_model_list(self, configuration_manager):
+        """Test that repeated model validation reuses a recent model list."""
+        await configuration_manager.validate_model_change("llama3.1")
+        is_valid, message = await configuration_manager.validate_model_change("nonexistent")
+        
+        assert is_valid is False
+        assert "not found" in message
+        configuration_manager.ollama_client.list_available_models.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_get_ollama_status_success(self, configuration_manager):
         """Test getting Ollama status successfully."""
@@ -364,6 +368,21 @@ class TestConfigurationManager:
         assert isinstance(response_time, int)
         assert response_time > 0
     
+    @pytest.mark.asyncio
+    async def test_get_ollama_status_bypasses_model_cache(self, configuration_manager):
+        """Test that status queries Ollama even when the model list is cached."""
+        mock_config = create_test_config(ollama_model="llama3.1")
+        client = configuration_manager.ollama_client
+        client.list_available_models.return_value = ["llama3.1"]
+        await configuration_manager._get_available_models()
+        
+        client.list_available_models.side_effect = Exception("Connection failed")
+        status, _, response_time = await configuration_manager._get_ollama_status(mock_config)
+        
+        assert status == "Disconnected"
+        assert response_time is None
+        assert client.list_available_models.await_count == 2
+    
     @pytest.mark.asyncio
     async def test_get_ollama_status_model_not_found(self, configuration_manager):
         """Test getting Ollama status when configured model not found."""
@@ -434,4 +453,24 @@ class TestConfigurationManager:
         cooldown_info = await configuration_manager._get_cooldown_status(mock_config)
         
         assert "Spont: Ready" in cooldown_info
-        assert "Resp: 60s" in cooldown_info
\ No newline at end of file
+        assert "Resp: 60s" in cooldown_info
+    
+    @pytest.mark.asyncio
+    async def test_performance_info_uses_shared_metrics_manager(self, channel_config_manager, mock_ollama_client):
+        """Test that status reads stats from the metrics manager it was given."""
+        metrics_manager = Mock()
+        metrics_manager.get_performance_stats = AsyncMock(return_value={
+            'metrics': {
+                'response_time': {'average': 1.5, 'count': 2, 'maximum': 2.0, 'minimum': 1.0},
+                'success_count': {'average': 1.0, 'count': 3, 'maximum': 1.0, 'minimum': 1.0}
+            },
+            'errors': {
+                'error_timeout': {'average': 1.0, 'count': 1, 'maximum': 1.0, 'minimum': 1.0}
+            }
+        })
+        config_manager = ConfigurationManager(channel_config_manager, mock_ollama_client, metrics_manager)
+        
+        perf_info = await config_manager._get_performance_info("testchannel")
+        
+        metrics_manager.get_performance_stats.assert_awaited_once_with("testchannel", hours=24)
+        assert perf_info == "Perf: Avg: 1.5s Success: 75%"
@@ -6,11 +6,14 @@ Tests database operations, connection handling, and error recovery.
 
 import pytest
 import asyncio
+import sqlite3
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch
 
-from chatbot.database.operations import DatabaseManager, ChannelConfigManager
+from chatbot.database.operations import DatabaseManager, ChannelConfigManager, MetricsManager, _SQLITE_HAS_RETURNING
 from chatbot.database.models import MessageEvent, Message, ChannelConfig
+from chatbot.database.resilience import ResilientDatabaseManager
 from tests.conftest import create_test_config, create_test_message
 
 
@@ -27,6 +30,19 @@ class TestDatabaseManager:
         assert manager.db_type == "sqlite"
         assert manager.connection_params["database_url"] == temp_db_file
     
+    @pytest.mark.asyncio
+    async def test_sqlite_synchronous_level(self, temp_db_file):
+        """Test that the SQLite synchronous level is validated and applied."""
+        with pytest.raises(ValueError):
+            DatabaseManager(db_type="sqlite", database_url=temp_db_file, synchronous="NORMAL; DROP TABLE messages")
+        
+        manager = DatabaseManager(db_type="sqlite", database_url=temp_db_file, synchronous="full")
+        await manager.initialize()
+        
+        rows = await manager.fetch_all("PRAGMA synchronous")
+        assert rows[0]['synchronous'] == 2  # FULL
+        await manager.close()
+    
     @pytest.mark.asyncio
     async def test_initialization_mysql_config(self):
         """Test MySQL database configuration (without actual connection)."""
@@ -73,6 +89,126 @@ class TestDatabaseManager:
         messages = await db_manager.get_recent_messages(sample_message_event.channel, 10)
         assert len(messages) == 1
     
+    @pytest.mark.asyncio
+    async def test_store_messages_batch(self, db_manager, sample_message_event):
+        """Test storing several messages in one batch, skipping duplicates."""
+        channel = sample_message_event.channel
+        events = [
+            MessageEvent(
+                message_id=f"batch-{i}",
+                channel=channel,
+                user_id=f"user{i}",
+                user_display_name=f"User{i}",
+                content=f"Batch {i}",
+                timestamp=datetime.now() + timedelta(seconds=i),
+                badges={}
+            )
+            for i in range(3)
+        ]
+        
+        assert await db_manager.store_message(sample_message_event) is True
+        assert await db_manager.store_messages(events + [sample_message_event]) is True
+        
+        messages = await db_manager.get_recent_messages(channel, 10)
+        assert len(messages) == 4
+        assert messages[-1].message_content == "Batch 2"
+    
+    @staticmethod
+    def _message_events(count: int):
+        """Create distinct MessageEvents for one channel."""
+        return [
+            MessageEvent(
+                message_id=f"queued-{i}",
+                channel="testchannel",
+                user_id=f"user{i}",
+                user_display_name=f"User{i}",
+                content=f"Queued {i}",
+                timestamp=datetime.now() + timedelta(seconds=i),
+                badges={}
+            )
+            for i in range(count)
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_store_message_is_coalesced(self, db_manager):
+        """Test that concurrent store_message calls share one batched insert."""
+        events = self._message_events(5)
+        
+        with patch.object(db_manager, 'store_messages', wraps=db_manager.store_messages) as store_messages:
+            results = await asyncio.gather(*(db_manager.store_message(event) for event in events))
+        
+        assert results == [True] * 5
+        store_messages.assert_called_once()
+        assert len(await db_manager.get_recent_messages("testchannel")) == 5
+    
+    @pytest.mark.asyncio
+    async def test_store_message_during_flush_is_written(self, db_manager):
+        """Test that a message queued while a batch is being written is flushed too."""
+        first, second = self._message_events(2)
+        write_many = db_manager._write_many
+        
+        async def slow_write_many(query, rows):
+            await asyncio.sleep(0.05)
+            await write_many(query, rows)
+        
+        with patch.object(db_manager, '_write_many', side_effect=slow_write_many):
+            first_store = asyncio.ensure_future(db_manager.store_message(first))
+            await asyncio.sleep(0.01)  # First batch is now being written
+            second_store = asyncio.ensure_future(db_manager.store_message(second))
+            
+            results = await asyncio.wait_for(asyncio.gather(first_store, second_store), timeout=1)
+        
+        assert results == [True, True]
+        assert db_manager._pending_messages == []
+        assert len(await db_manager.get_recent_messages("testchannel")) == 2
+    
+    @pytest.mark.asyncio
+    async def test_full_message_queue_is_written_immediately(self, db_manager):
+        """Test that reaching MAX_MESSAGE_BATCH writes without waiting for the timer."""
+        db_manager.MESSAGE_FLUSH_INTERVAL = 60
+        db_manager.MAX_MESSAGE_BATCH = 3
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(*(db_manager.store_message(event) for event in self._message_events(3))),
+            timeout=1
+        )
+        
+        assert results == [True] * 3
+        assert len(await db_manager.get_recent_messages("testchannel")) == 3
+    
+    @pytest.mark.asyncio
+    async def test_store_message_failure_reaches_every_caller(self, db_manager):
+        """Test that a failed batched insert is reported to all waiting callers."""
+        with patch.object(db_manager, 'get_connection', side_effect=sqlite3.DatabaseError("disk I/O error")):
+            results = await asyncio.gather(
+                *(db_manager.store_message(event) for event in self._message_events(3))
+            )
+        
+        assert results == [False] * 3
+        assert db_manager._pending_messages == []
+    
+    @pytest.mark.asyncio
+    async def test_get_recent_messages_chronological_order(self, db_manager):
+        """Test that the newest messages are returned oldest first."""
+        base_time = datetime.now()
+        events = [
+            MessageEvent(
+                message_id=f"order-{i}",
+                channel="testchannel",
+                user_id="12345",
+                user_display_name="TestUser",
+                content=f"Message {i}",
+                timestamp=base_time + timedelta(seconds=i),
+                badges={}
+            )
+            for i in (3, 0, 4, 1, 2)  # Stored out of order
+        ]
+        assert await db_manager.store_messages(events) is True
+        
+        messages = await db_manager.get_recent_messages("testchannel", limit=3)
+        
+        assert [m.message_id for m in messages] == ["order-2", "order-3", "order-4"]
+    
     @pytest.mark.asyncio
     async def test_get_recent_messages_empty(self, db_manager):
         """Test getting messages from empty database."""
@@ -317,6 +453,72 @@ class TestDatabaseManager:
         
         assert result is False  # Should fail gracefully
     
+    @pytest.mark.asyncio
+    async def test_resilient_manager_batch_and_limited_count(self, db_manager):
+        """Test that the resilient wrapper forwards batch stores and count limits."""
+        resilient_manager = ResilientDatabaseManager(db_manager)
+        events = (
+            MessageEvent(
+                message_id=f"resilient-{i}",
+                channel="testchannel",
+                user_id=f"user{i}",
+                user_display_name=f"User{i}",
+                content=f"Message {i}",
+                timestamp=datetime.now(),
+                badges={}
+            )
+            for i in range(3)
+        )
+        
+        assert await resilient_manager.store_messages(events) is True
+        assert await resilient_manager.count_recent_messages("testchannel") == 3
+        assert await resilient_manager.count_recent_messages("testchannel", limit=2) == 2
+    
+    @staticmethod
+    def _fail_connections(db_manager, failures: int, error: Exception) -> list:
+        """Make the first `failures` connection checkouts raise error; returns the attempt log."""
+        attempts = []
+        get_connection = db_manager.get_connection
+        
+        @asynccontextmanager
+        async def flaky_connection():
+            attempts.append(len(attempts) + 1)
+            if len(attempts) <= failures:
+                raise error
+            async with get_connection() as conn:
+                yield conn
+        
+        db_manager.get_connection = flaky_connection
+        db_manager.RETRY_BASE_DELAY = 0
+        return attempts
+    
+    @pytest.mark.asyncio
+    async def test_operational_error_is_retried(self, db_manager, sample_message_event):
+        """Test that transient OperationalErrors are retried until the operation succeeds."""
+        attempts = self._fail_connections(db_manager, 2, sqlite3.OperationalError("database is locked"))
+        
+        assert await db_manager.store_messages([sample_message_event]) is True
+        assert len(attempts) == 3
+        
+        messages = await db_manager.get_recent_messages(sample_message_event.channel)
+        assert [m.message_id for m in messages] == [sample_message_event.message_id]
+    
+    @pytest.mark.asyncio
+    async def test_retries_give_up_after_max_retries(self, db_manager, sample_message_event):
+        """Test that retrying stops after MAX_RETRIES and the failure is reported."""
+        attempts = self._fail_connections(db_manager, 100, sqlite3.OperationalError("database is locked"))
+        
+        assert await db_manager.store_messages([sample_message_event]) is False
+        assert len(attempts) == db_manager.MAX_RETRIES + 1
+    
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self, db_manager):
+        """Test that errors other than OperationalError fail on the first attempt."""
+        attempts = self._fail_connections(db_manager, 100, sqlite3.IntegrityError("constraint failed"))
+        
+        assert await db_manager.delete_message_by_id("test-msg") is False
+        assert len(attempts) == 1
+    
     @pytest.mark.asyncio
     async def test_get_connection_status(self, db_manager):
         """Test getting connection status information."""
@@ -355,6 +557,30 @@ class TestChannelConfigManager:
         
         assert config1 is config2  # Same object reference
     
+    @pytest.mark.asyncio
+    async def test_get_config_cache_expiry(self, channel_config_manager):
+        """Test that cached configuration is reloaded after the TTL."""
+        config1 = await channel_config_manager.get_config("testchannel")
+        
+        # Expire the cached entry
+        channel_config_manager._config_expires["testchannel"] = 0
+        config2 = await channel_config_manager.get_config("testchannel")
+        
+        assert config2 is not config1
+        assert config2.channel == "testchannel"
+    
+    @pytest.mark.asyncio
+    async def test_get_config_error_is_cached(self, channel_config_manager):
+        """Test that the fallback config is cached briefly after a failed load."""
+        with patch.object(channel_config_manager.db_manager, 'get_connection',
+                          side_effect=Exception("Database down")) as mock_conn:
+            config1 = await channel_config_manager.get_config("testchannel")
+            config2 = await channel_config_manager.get_config("testchannel")
+        
+        assert config1 is config2
+        assert config1.message_threshold == 30  # Default value
+        assert mock_conn.call_count == 1
+    
     @pytest.mark.asyncio
     async def test_update_config_success(self, channel_config_manager):
         """Test successful configuration update."""
@@ -455,6 +681,66 @@ class TestChannelConfigManager:
         can_respond = await channel_config_manager.can_respond_to_user(channel, user_id)
         assert can_respond is False
     
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not _SQLITE_HAS_RETURNING, reason="SQLite lacks UPDATE ... RETURNING")
+    async def test_increment_message_count_returning(self, channel_config_manager):
+        """Test incrementing the message count with UPDATE ... RETURNING."""
+        channel = "testchannel"
+        await channel_config_manager.get_config(channel)
+        
+        assert await channel_config_manager.increment_message_count(channel) == 1
+        assert await channel_config_manager.increment_message_count(channel) == 2
+        assert (await channel_config_manager.get_config(channel)).message_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_increment_message_count_without_returning(self, channel_config_manager):
+        """Test incrementing the message count on SQLite versions without RETURNING."""
+        channel = "testchannel"
+        await channel_config_manager.get_config(channel)
+        
+        with patch('chatbot.database.operations._SQLITE_HAS_RETURNING', False):
+            assert await channel_config_manager.increment_message_count(channel) == 1
+            assert await channel_config_manager.increment_message_count(channel) == 2
+        
+        assert (await channel_config_manager.get_config(channel)).message_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_increment_message_count_mysql(self):
+        """Test that MySQL reads the new count back through LAST_INSERT_ID."""
+        cursor = Mock(rowcount=1, lastrowid=7)
+        conn = Mock()
+        conn.cursor.return_value = cursor
+        
+        @asynccontextmanager
+        async def get_connection():
+            yield conn
+        
+        db_manager = Mock(db_type='mysql', get_connection=get_connection)
+        manager = ChannelConfigManager(db_manager)
+        
+        assert await manager.increment_message_count("testchannel") == 7
+        assert "LAST_INSERT_ID(message_count + 1)" in cursor.execute.call_args[0][0]
+        
+        # No row matched, so LAST_INSERT_ID was not set by this statement
+        cursor.rowcount = 0
+        assert await manager.increment_message_count("testchannel") == 0
+    
+    @pytest.mark.asyncio
+    async def test_update_config_rejects_unknown_setting(self, channel_config_manager):
+        """Test that unknown setting names are rejected before any SQL runs."""
+        db_manager = channel_config_manager.db_manager
+        with patch.object(db_manager, 'get_connection', wraps=db_manager.get_connection) as get_connection:
+            result = await channel_config_manager.update_config(
+                "testchannel", "message_count = 0, channel", "other"
+            )
+            
+            assert result is False
+            # Real columns that are not settings are rejected too
+            assert await channel_config_manager.update_config("testchannel", "channel", "other") is False
+            get_connection.assert_not_called()
+        
+        assert "message_count = 0, channel" not in channel_config_manager._setting_updates
+    
     @pytest.mark.asyncio
     async def test_config_validation(self, channel_config_manager):
         """Test configuration value validation."""
@@ -467,4 +753,32 @@ class TestChannelConfigManager:
         # Invalid values should be rejected
         assert await channel_config_manager.update_config(channel, "message_threshold", 0) is False
         assert await channel_config_manager.update_config(channel, "message_threshold", 2000) is False
-        assert await channel_config_manager.update_config(channel, "spontaneous_cooldown", -1) is False
\ No newline at end of file
+        assert await channel_config_manager.update_config(channel, "spontaneous_cooldown", -1) is False
+
+
+class TestMetricsManager:
+    """Test cases for MetricsManager."""
+    
+    @pytest.mark.asyncio
+    async def test_record_metric_is_stored(self, db_manager):
+        """Test that each recorded metric is written right away."""
+        metrics_manager = MetricsManager(db_manager)
+        
+        assert await metrics_manager.record_success("testchannel") is True
+        assert await metrics_manager.record_error("testchannel", "timeout") is True
+        
+        rows = await db_manager.fetch_all("SELECT COUNT(*) AS n FROM bot_metrics")
+        assert rows[0]['n'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_performance_stats_list_errors_separately(self, db_manager):
+        """Test that stats list error metrics only under 'errors'."""
+        metrics_manager = MetricsManager(db_manager)
+        await metrics_manager.record_response_time("testchannel", 2.0)
+        await metrics_manager.record_error("testchannel", "timeout")
+        
+        stats = await metrics_manager.get_performance_stats("testchannel")
+        
+        assert set(stats['metrics']) == {'response_time'}
+        assert stats['metrics']['response_time']['average'] == 2.0
+        assert set(stats['errors']) == {'error_timeout'}